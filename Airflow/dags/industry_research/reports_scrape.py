@@ -175,8 +175,7 @@ def process_reports_pipeline():
                         # Store in Pinecone
                         chunks = markdown_header_chunks(summary)
                         embeddings_data = []
-                        for chunk in chunks:
-                            embedding = generate_embeddings(chunk)
+                        for chunk, embedding in zip(chunks, generate_embeddings(chunks)):
                             embeddings_data.append({
                                 'content': chunk,
                                 'embedding': embedding,
@@ -233,8 +232,7 @@ def process_reports_pipeline():
                             # Store in Pinecone
                             chunks = markdown_header_chunks(summary)
                             embeddings_data = []
-                            for chunk in chunks:
-                                embedding = generate_embeddings(chunk)
+                            for chunk, embedding in zip(chunks, generate_embeddings(chunks)):
                                 embeddings_data.append({
                                     'content': chunk,
                                     'embedding': embedding,
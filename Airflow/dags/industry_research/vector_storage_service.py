@@ -9,6 +9,12 @@ load_dotenv()
 # Global model cache for efficiency
 _model = None
 
+# Concurrent upsert requests per Pinecone index connection
+UPSERT_POOL_THREADS = 30
+
+# Indexes confirmed to exist in this process, so later stores skip list_indexes()
+_known_indexes = set()
+
 def get_embedding_model(model_name="sentence-transformers/all-MiniLM-L6-v2"):
     """Get or initialize the embedding model"""
     global _model
@@ -32,7 +38,8 @@ def generate_embeddings(text, model_name="sentence-transformers/all-MiniLM-L6-v2
     if isinstance(text, str):
         return model.encode(text).tolist()
     else:
-        return model.encode(text).tolist()
+        # One batched call tokenizes all texts together with the fast tokenizer
+        return model.encode(list(text), batch_size=64, show_progress_bar=False).tolist()
 
 def store_in_pinecone(embeddings_data, index_name="deloitte-reports"):
     """Store embeddings data in Pinecone"""
@@ -45,8 +52,8 @@ def store_in_pinecone(embeddings_data, index_name="deloitte-reports"):
             
         pc = Pinecone(api_key=api_key)
         
-        # Check if index exists
-        if index_name not in [idx["name"] for idx in pc.list_indexes()]:
+        # Check if index exists (once per process)
+        if index_name not in _known_indexes and index_name not in [idx["name"] for idx in pc.list_indexes()]:
             # Get dimension from first embedding
             dimension = len(embeddings_data[0]['embedding'])
             
@@ -61,8 +68,10 @@ def store_in_pinecone(embeddings_data, index_name="deloitte-reports"):
                 )
             )
         
-        # Get index
-        index = pc.Index(index_name)
+        _known_indexes.add(index_name)
+        
+        # Get index (thread pool lets batch upserts run in parallel)
+        index = pc.Index(index_name, pool_threads=UPSERT_POOL_THREADS)
         
         # Prepare vectors for Pinecone
         vectors = []
@@ -81,11 +90,14 @@ def store_in_pinecone(embeddings_data, index_name="deloitte-reports"):
             }
             vectors.append(vector)
         
-        # Upsert in batches
+        # Upsert in batches, issuing all of them before waiting on any
         batch_size = 100
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i:i + batch_size]
-            index.upsert(vectors=batch)
+        async_results = [
+            index.upsert(vectors=vectors[i:i + batch_size], async_req=True)
+            for i in range(0, len(vectors), batch_size)
+        ]
+        for async_result in async_results:
+            async_result.get()
         
         print(f"Stored {len(embeddings_data)} chunks in Pinecone index '{index_name}'")
         return True
@@ -352,9 +352,7 @@ def store_in_pinecone(**context):
                 
             # Process each chunk
             embeddings_data = []
-            for chunk in chunks:
-                embedding = generate_embeddings(chunk)
-                
+            for chunk, embedding in zip(chunks, generate_embeddings(chunks)):
                 if embedding:
                     embeddings_data.append({
                         'content': chunk,
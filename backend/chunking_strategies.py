@@ -1,6 +1,9 @@
 import re
 from typing import List
 
+# Regular expression to find markdown headers
+HEADER_PATTERN = re.compile(r'^(#{1,6})\s+(.*)', re.MULTILINE)
+
 def markdown_header_chunks(text: str) -> List[str]:
         """
         Chunk text based on markdown headers.
@@ -11,34 +14,21 @@ def markdown_header_chunks(text: str) -> List[str]:
         Returns:
             List of text chunks with headers as separation points.
         """
-        # Regular expression to find markdown headers
-        header_pattern = re.compile(r'^(#{1,6})\s+(.*)', re.MULTILINE)
-        
-        # Find all headers and their positions
-        headers = [(match.start(), match.group()) for match in header_pattern.finditer(text)]
+        # Chunk boundaries: start of text, every header position, end of text
+        boundaries = [0]
+        boundaries.extend(match.start() for match in HEADER_PATTERN.finditer(text))
         
         # If no headers found, return whole text as one chunk
-        if not headers:
+        if len(boundaries) == 1:
             return [text.strip()]
         
-        chunks = []
-        
-        # First chunk includes everything before the first header
-        if headers[0][0] > 0:
-            chunks.append(text[:headers[0][0]].strip())
+        boundaries.append(len(text))
         
-        # Process chunks between headers
-        for i in range(len(headers)):
-            start_pos = headers[i][0]
-            # If this is the last header, end position is the end of text
-            if i == len(headers) - 1:
-                end_pos = len(text)
-            else:
-                end_pos = headers[i+1][0]
-            
-            # Add the chunk, including the header
+        # Slice once between consecutive boundaries, skipping empty chunks as we go
+        chunks = []
+        for start_pos, end_pos in zip(boundaries, boundaries[1:]):
             chunk = text[start_pos:end_pos].strip()
             if chunk:
                 chunks.append(chunk)
         
-        return [chunk for chunk in chunks if chunk]  # Remove any empty chunks
\ No newline at end of file
+        return chunks
@@ -1,8 +1,13 @@
 from database.snowflake_connect import account_login
 from dotenv import load_dotenv
 import pandas as pd
+import re
 
 load_dotenv()
+
+# Unquoted Snowflake identifier; anything else is rejected before reaching the SQL text
+COLUMN_NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*")
+
 def get_investor_by_username(username):
     conn, cur = account_login()
     cur.execute("SELECT * FROM startup_information.investor WHERE username = %s", (username,))
@@ -28,8 +33,14 @@ def get_startup_info_by_id(startup_id):
     return dict(zip([desc[0] for desc in cur.description], row))
 
 def get_startup_column_by_id(column_name: str, startup_id: int):
+    # Column names cannot be bound as parameters, so only plain identifiers are accepted;
+    # upper-casing keeps the query text identical across callers so Snowflake's result cache is reused
+    if not COLUMN_NAME_PATTERN.fullmatch(column_name or ""):
+        raise ValueError(f"Invalid column name: {column_name}")
+    column_name = column_name.upper()
+    
     conn, cur = account_login()
-    # Build the query with the column name injected
+    # Build the query with the validated column name injected
     query = f"""
         SELECT s.{column_name}
         FROM startup_information.startup AS s
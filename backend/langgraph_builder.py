@@ -1,11 +1,12 @@
 from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv
 import os
+import asyncio
 import google.generativeai as genai
 from state import AnalysisState
 from pinecone_pipeline.summary import summarize_pitch_deck_with_gemini
-from pinecone_pipeline.embedding_manager import EmbeddingManager
-from s3_utils import upload_pitch_deck_to_s3
+from pinecone_pipeline.embedding_manager import get_embedding_manager
+from s3_utils import upload_pitch_deck_to_s3, generate_presigned_url, bucket_name
 import snowflake.connector
 from pinecone_pipeline.mcp_google_search_agent import google_search_with_fallback
 import datetime
@@ -13,15 +14,24 @@ from log_gemini_interaction import log_gemini_interaction
 import plotly.graph_objects as go
 import plotly.express as px
 import json
+from concurrent.futures import ThreadPoolExecutor
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 genai.configure(api_key=GEMINI_API_KEY)
 
-# Initialize embedding manager
+# Investment report model, built once and reused for every report
+REPORT_MODEL_NAME = "gemini-1.5-flash"
+report_model = genai.GenerativeModel(REPORT_MODEL_NAME)
+
+# Shared pool for the independent I/O steps of pitch deck processing (S3 upload, Gemini summary)
+pitch_deck_executor = ThreadPoolExecutor(max_workers=8)
+
+# Share the process-wide embedding manager, so stores here invalidate the search cache /chat reads
 try:
-    embedding_manager = EmbeddingManager()
+    embedding_manager = get_embedding_manager()
 except Exception as e:
+    embedding_manager = None
     print(f"Warning: Failed to initialize embedding manager. Pinecone functionality will be disabled: {e}")
 
 # -------------------------
@@ -145,37 +155,57 @@ def store_analysis_report(startup_name: str, report_text: str):
 # -------------------------
 def process_pitch_deck(state):
     """Process a pitch deck PDF and generate a summary"""
-    # Debug printing to help diagnose the issue
-    if not state.get("pdf_file_path"):
+    # The PDF arrives either in memory (uploads) or as a path on disk
+    pdf_bytes = state.get("pdf_bytes")
+    file_path = state.get("pdf_file_path")
+    if not pdf_bytes and not file_path:
         print("No PDF file path provided")
         state["error"] = "No PDF file path provided"
         return state
     
     # Check if the file exists
-    file_path = state["pdf_file_path"]
-    if not os.path.exists(file_path):
+    if not pdf_bytes and not os.path.exists(file_path):
         print(f"File doesn't exist at path: {file_path}")
         state["error"] = f"File doesn't exist at path: {file_path}"
         return state
         
     try:
-        print(f"Processing file: {file_path}")
+        print(f"Processing file: {file_path or state.get('original_filename')}")
         # Extract variables from state
         startup_name = state.get("startup_name", "Unknown")
         industry = state.get("industry", "Unknown")
         linkedin_urls = state.get("linkedin_urls", [])
         website_url = state.get("website_url", "")
-        original_filename = state.get("original_filename", os.path.basename(file_path))
+        original_filename = state.get("original_filename", os.path.basename(file_path or ""))
         
-        print(f"Uploading file to S3 for {startup_name} in {industry}")
-        # Upload file to S3
-        s3_location = upload_pitch_deck_to_s3(
+        print(f"Uploading file to S3 and generating summary using Gemini for {startup_name} in {industry}")
+        # S3 upload and Gemini summary are independent, so run them concurrently;
+        # decks the client already uploaded through a presigned URL only need a read URL
+        s3_key = state.get("s3_key")
+        if s3_key:
+            s3_future = pitch_deck_executor.submit(generate_presigned_url, bucket_name, s3_key)
+        else:
+            s3_future = pitch_deck_executor.submit(
+                upload_pitch_deck_to_s3,
+                file_path=file_path,
+                startup_name=startup_name,
+                industry=industry,
+                original_filename=original_filename,
+                file_bytes=pdf_bytes
+            )
+        summary_future = pitch_deck_executor.submit(
+            summarize_pitch_deck_with_gemini,
             file_path=file_path,
-            startup_name=startup_name,
-            industry=industry,
-            original_filename=original_filename
+            api_key=GEMINI_API_KEY,
+            model_name="gemini-1.5-flash",
+            pdf_bytes=pdf_bytes,
+            display_name=original_filename
         )
         
+        # Wait for both before returning so neither outlives the uploaded data
+        s3_location = s3_future.result()
+        investor_summary = summary_future.result()
+        
         print(f"S3 Upload result: {s3_location}")
         if not s3_location:
             state["error"] = "Failed to upload file to S3"
@@ -183,14 +213,6 @@ def process_pitch_deck(state):
             
         state["s3_location"] = s3_location
         
-        print(f"Generating summary using Gemini for {file_path}")
-        # Generate summary using Gemini
-        investor_summary = summarize_pitch_deck_with_gemini(
-            file_path=file_path,
-            api_key=GEMINI_API_KEY,
-            model_name="gemini-1.5-flash"
-        )
-        
         print(f"Summary generation complete: {investor_summary is not None}")
         if not investor_summary:
             state["error"] = "Failed to generate summary"
@@ -326,13 +348,12 @@ def generate_report(state):
     # Extract key information for logging
     startup_name = state["summary"].get("STARTUP_NAME", "Unknown")
     industry = state["summary"].get("INDUSTRY", "Unknown")
-    model_name = "gemini-1.5-flash"
+    model_name = REPORT_MODEL_NAME
     
     # Start timing for response time measurement
     start_time = datetime.datetime.now()
     
     # Generate the prompt and response
-    model = genai.GenerativeModel(model_name)
     prompt = generate_gemini_prompt(
         startup=state["summary"],
         industry_report=state["industry_report"],
@@ -340,7 +361,7 @@ def generate_report(state):
     )
     
     # Generate the content
-    response = model.generate_content(prompt)
+    response = report_model.generate_content(prompt)
     final_report = response.text
     
     # Calculate response time
@@ -399,8 +420,8 @@ async def fetch_news(state):
     # Store the news in the state
     state["news"] = news_content
     print("news_content", news_content)
-    # Update the Snowflake table with the news
-    store_news_in_snowflake(startup_name, news_content)
+    # Update the Snowflake table with the news; the connector is blocking, so keep it off the event loop
+    await asyncio.to_thread(store_news_in_snowflake, startup_name, news_content)
     
     return state
 
@@ -584,7 +605,7 @@ def build_analysis_graph():
 
     # Set conditional starting point
     builder.set_conditional_entry_point(
-        lambda state: "process_pitch_deck" if state.get("pdf_file_path") else "fetch_summary"
+        lambda state: "process_pitch_deck" if state.get("pdf_bytes") or state.get("pdf_file_path") else "fetch_summary"
     )
     
     # Add edges
@@ -1,32 +1,47 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from pydantic import BaseModel
 from langgraph_builder import build_analysis_graph
-from pinecone_pipeline.embedding_manager import EmbeddingManager
+from pinecone_pipeline.embedding_manager import get_embedding_manager
 from startup_check import startup_exists_check, StartupCheckRequest
 from database import db_utils, investor_auth, investorIntel_entity
-from pinecone_pipeline.gemini_assistant import GeminiAssistant
+from pinecone_pipeline.gemini_assistant import get_gemini_assistant, BATCH_DONE_STATES
+from pinecone_pipeline.mcp_google_search_agent import close_search_client
 import os
+import asyncio
+import logging
 import pandas as pd
-import tempfile
-import shutil
-import json
-import traceback
+import orjson
 from typing import List, Optional
-from s3_utils import upload_pitch_deck_to_s3
-from pinecone_pipeline.embedding_manager import EmbeddingManager
+from s3_utils import build_pitch_deck_key, generate_presigned_upload_url, get_s3_object_bytes, bucket_name, PITCH_DECK_UPLOAD_URL_EXPIRATION
 from database.snowflake_connect import get_connection
 
+# Configure logging; WARNING by default so per-request info/debug lines are not formatted or written
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+logger = logging.getLogger(__name__)
+
+# Largest pitch deck accepted by /process-pitch-deck
+MAX_PITCH_DECK_BYTES = 50 * 1024 * 1024
+
+# Responses smaller than this (bytes) are sent uncompressed
+GZIP_MINIMUM_SIZE = 1024
+
+# Sentinel queries that simulate an empty database, matched with one set lookup
+TEST_EMPTY_QUERIES = frozenset({"test empty database", "test no results"})
+
 # Initialize Snowflake connection at startup
 conn, cursor = get_connection()
 
-embedding_manager = EmbeddingManager()
-gemini_assistant = GeminiAssistant()
+embedding_manager = get_embedding_manager()
+gemini_assistant = get_gemini_assistant()
 
 app = FastAPI(
     title="InvestorIntel API",
     description="API for processing startup pitch decks and generating investor summaries",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Create the langgraph
@@ -41,6 +56,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies (search results, summaries) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 # ------- Models -------
 class AnalyzeRequest(BaseModel):
     startup_name: str
@@ -51,6 +69,11 @@ class PitchDeckRequest(BaseModel):
     linkedin_urls: Optional[List[str]] = []
     website_url: Optional[str] = None
 
+class PitchDeckPresignRequest(BaseModel):
+    startup_name: Optional[str] = None
+    industry: Optional[str] = None
+    filename: Optional[str] = None
+
 class StartupRequest(BaseModel):
     startup_name: str
     email_address: str
@@ -120,7 +143,8 @@ async def health_check():
 @app.post("/check-startup-exists")
 async def check_startup_exists(request: StartupCheckRequest):
     """Check if a startup already exists in the database"""
-    return startup_exists_check(request.startup_name)
+    # The Snowflake lookup blocks, so keep it off the event loop
+    return await asyncio.to_thread(startup_exists_check, request.startup_name)
 
 @app.post("/analyze")
 def analyze_startup(request: AnalyzeRequest):
@@ -136,9 +160,26 @@ def analyze_startup(request: AnalyzeRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/pitch-deck/presign")
+def presign_pitch_deck(request: PitchDeckPresignRequest):
+    """
+    Issue a presigned PUT URL so the client uploads the pitch deck straight to S3,
+    then sends the returned s3_key to /process-pitch-deck instead of the file.
+    """
+    s3_key = build_pitch_deck_key(request.startup_name or "Unknown", request.industry or "Unknown", request.filename)
+    upload_url = generate_presigned_upload_url(bucket_name, s3_key)
+    if not upload_url:
+        raise HTTPException(status_code=500, detail="Failed to generate upload URL")
+    return {
+        "upload_url": upload_url,
+        "s3_key": s3_key,
+        "expires_in": PITCH_DECK_UPLOAD_URL_EXPIRATION
+    }
+
 @app.post("/process-pitch-deck")
 async def process_pitch_deck(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    s3_key: str = Form(None),
     startup_name: str = Form(None),
     industry: str = Form(None),
     linkedin_urls: str = Form(None),
@@ -151,94 +192,106 @@ async def process_pitch_deck(
 ):
     """
     Process a pitch deck PDF, generate summary, and analysis report all at once.
+    The PDF is either uploaded as a file or already in S3 under s3_key (see /pitch-deck/presign).
     """
+    if file is None and not s3_key:
+        raise HTTPException(status_code=400, detail="Provide either a pitch deck file or an s3_key")
+    if s3_key and not s3_key.startswith("pitchdecks/"):
+        raise HTTPException(status_code=400, detail="s3_key must point to an uploaded pitch deck")
+    
     # Parse the LinkedIn URLs from JSON string if provided
-    linkedin_urls_list = []
-    if linkedin_urls:
+    # Only a value that looks like JSON is parsed; a plain URL skips the guaranteed decode error
+    linkedin_urls = (linkedin_urls or "").strip()
+    linkedin_urls_list = [linkedin_urls] if linkedin_urls else []
+    if linkedin_urls.startswith(("[", "{")):
         try:
-            linkedin_urls_list = json.loads(linkedin_urls)
-        except json.JSONDecodeError:
+            linkedin_urls_list = orjson.loads(linkedin_urls)
+        except orjson.JSONDecodeError:
             # If not valid JSON, treat it as a single URL
-            linkedin_urls_list = [linkedin_urls]
+            pass
     
     # Get the original filename
-    original_filename = file.filename
+    original_filename = file.filename if file is not None else os.path.basename(s3_key)
     
     # Set default values if not provided
     startup_name = startup_name or "Unknown"
     industry = industry or "Unknown"
-    print("Startup name:", startup_name)
-    print("Funding info:", funding_amount, round_type, equity_offered)
+    logger.debug("Startup name: %s", startup_name)
+    logger.debug("Funding info: %s %s %s", funding_amount, round_type, equity_offered)
     
-    # Create a temporary directory to store the uploaded file
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create a temporary filename for local storage
-        temp_filename = f"temp_pitch_deck.pdf"
-        file_path = os.path.join(temp_dir, temp_filename)
-        
-        # Save the uploaded file to the temporary directory
+    # Read the upload once into memory; S3 and Gemini both take the bytes directly
+    if file is None:
+        # The client uploaded straight to S3, so only Gemini needs the content
+        pdf_bytes = await asyncio.to_thread(get_s3_object_bytes, s3_key)
+        if pdf_bytes is None:
+            raise HTTPException(status_code=404, detail=f"Pitch deck not found in S3: {s3_key}")
+    else:
+        if file.size is not None and file.size > MAX_PITCH_DECK_BYTES:
+            raise HTTPException(status_code=413, detail="Pitch deck exceeds the 50 MB upload limit")
         try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            pdf_bytes = await file.read()
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
-        
-        # Process with langgraph
-        try:
-            # Prepare the initial state for the graph with funding information
-            initial_state = {
-                "pdf_file_path": file_path,
-                "startup_name": startup_name,
-                "industry": industry,
-                "linkedin_urls": linkedin_urls_list,
-                "website_url": website_url,
-                "original_filename": original_filename,
-                # Add funding information to the initial state
-                "funding_info": {
-                    "funding_amount": funding_amount,
-                    "round_type": round_type,
-                    "equity_offered": equity_offered,
-                    "pre_money_valuation": pre_money_valuation,
-                    "post_money_valuation": post_money_valuation
-                }
+            raise HTTPException(status_code=500, detail=f"Failed to read file: {str(e)}")
+    if len(pdf_bytes) > MAX_PITCH_DECK_BYTES:
+        raise HTTPException(status_code=413, detail="Pitch deck exceeds the 50 MB upload limit")
+    
+    # Process with langgraph
+    try:
+        # Prepare the initial state for the graph with funding information
+        initial_state = {
+            "pdf_bytes": pdf_bytes,
+            "s3_key": s3_key,
+            "startup_name": startup_name,
+            "industry": industry,
+            "linkedin_urls": linkedin_urls_list,
+            "website_url": website_url,
+            "original_filename": original_filename,
+            # Add funding information to the initial state
+            "funding_info": {
+                "funding_amount": funding_amount,
+                "round_type": round_type,
+                "equity_offered": equity_offered,
+                "pre_money_valuation": pre_money_valuation,
+                "post_money_valuation": post_money_valuation
             }
-            global graph
-            if not graph:
-                graph = build_analysis_graph()
-
-            result = await graph.ainvoke(initial_state)
-            
-            # Check for errors
-            if "error" in result:
-                raise HTTPException(status_code=500, detail=result["error"])
-            
-            # Return the results
-            return {
-                "startup_name": startup_name,
-                "industry": industry,
-                "linkedin_urls": linkedin_urls_list,
-                "s3_location": result.get("s3_location"),
-                "original_filename": original_filename,
-                "summary": result.get("summary_text"),
-                "embedding_status": result.get("embedding_status"),
-                "final_report": result.get("final_report"),
-                "news": result.get("news"),
-                "competitor_visualizations": result.get("competitor_visualizations"),
-                "funding_info": {
-                    "funding_amount": funding_amount,
-                    "round_type": round_type,
-                    "equity_offered": equity_offered,
-                    "pre_money_valuation": pre_money_valuation,
-                    "post_money_valuation": post_money_valuation
-                }
+        }
+        global graph
+        if not graph:
+            graph = build_analysis_graph()
+
+        result = await graph.ainvoke(initial_state)
+        
+        # Check for errors
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=result["error"])
+        
+        # Return the results
+        return {
+            "startup_name": startup_name,
+            "industry": industry,
+            "linkedin_urls": linkedin_urls_list,
+            "s3_location": result.get("s3_location"),
+            "original_filename": original_filename,
+            "summary": result.get("summary_text"),
+            "embedding_status": result.get("embedding_status"),
+            "final_report": result.get("final_report"),
+            "news": result.get("news"),
+            "competitor_visualizations": result.get("competitor_visualizations"),
+            "funding_info": {
+                "funding_amount": funding_amount,
+                "round_type": round_type,
+                "equity_offered": equity_offered,
+                "pre_money_valuation": pre_money_valuation,
+                "post_money_valuation": post_money_valuation
             }
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            print(traceback.format_exc())
-            raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+        }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Processing error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+    
 @app.post("/add-startup-info")
 def add_startup(data: StartupRequest):
     try:
@@ -366,7 +419,12 @@ def fetch_investor_by_username(req: InvestorByUsernameRequest):
     
 class ChatRequest(BaseModel):
     query: str
+    min_score: Optional[float] = None
     
+def _min_score(request: ChatRequest) -> float:
+    """Relevance cutoff for a chat search: the request's own, else the assistant's threshold"""
+    return gemini_assistant.min_relevance_threshold if request.min_score is None else request.min_score
+
 @app.post("/chat")
 async def chat(request: ChatRequest):
     """Process a chat query and return an AI response with results from both startup and report data."""
@@ -380,7 +438,7 @@ async def chat(request: ChatRequest):
         }
     
     # Handle test cases for empty database or other edge cases
-    if query.lower() in ["test empty database", "test no results"]:
+    if query.lower() in TEST_EMPTY_QUERIES:
         return {
             "response": "I don't have any information about that in my database. Please try asking about a different startup or topic.",
             "query": query,
@@ -389,9 +447,12 @@ async def chat(request: ChatRequest):
     
     try:
         # Search for relevant information across both startup data and Deloitte reports
-        results = embedding_manager.search_similar_startups(
+        # (blocking Pinecone calls, run off the event loop)
+        results = await asyncio.to_thread(
+            embedding_manager.search_similar_startups,
             query=query,
-            top_k=8  # Increased to get more combined results
+            top_k=8,  # Increased to get more combined results
+            min_score=_min_score(request)
         )
         
         # Check if we have any results
@@ -406,8 +467,9 @@ async def chat(request: ChatRequest):
         startup_count = sum(1 for r in results if r.get("source") == "startup")
         report_count = sum(1 for r in results if r.get("source") == "deloitte-report")
         
-        # Process with Gemini
-        ai_response = gemini_assistant.process_query_with_results(
+        # Process with Gemini (a blocking call, run off the event loop)
+        ai_response = await asyncio.to_thread(
+            gemini_assistant.process_query_with_results,
             query=query,
             search_results=results
         )
@@ -422,7 +484,7 @@ async def chat(request: ChatRequest):
                       ["startup"] if startup_count > 0 else ["deloitte-report"]
         }
     except Exception as e:
-        print(f"Chat error: {str(e)}", exc_info=True)
+        logger.error("Chat error: %s", e, exc_info=True)
         # Return a user-friendly error message
         return {
             "response": "I'm having trouble processing your request right now. Please try again with a different question.",
@@ -431,6 +493,99 @@ async def chat(request: ChatRequest):
             "error": str(e)
         }
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Stream the AI response to a chat query as plain text while Gemini generates it."""
+    query = request.query.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Please enter a question about startups or industry trends.")
+    
+    try:
+        # The Pinecone search blocks, so keep it off the event loop
+        results = await asyncio.to_thread(
+            embedding_manager.search_similar_startups, query=query, top_k=8, min_score=_min_score(request)
+        )
+    except Exception as e:
+        logger.error("Chat stream search error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return StreamingResponse(
+        gemini_assistant.process_query_with_results_stream(query=query, search_results=results or []),
+        media_type="text/plain"
+    )
+
+class BulkAnalyzeRequest(BaseModel):
+    queries: List[str]
+
+@app.post("/bulk-analyze")
+def bulk_analyze(request: BulkAnalyzeRequest):
+    """
+    Submit many queries to the Gemini Batch API (slower, half the token cost) and return right away.
+    Answers available without Gemini are included; poll /bulk-analyze/results for the rest.
+    """
+    queries = [q.strip() for q in request.queries if q.strip()]
+    if not queries:
+        raise HTTPException(status_code=400, detail="At least one non-empty query is required")
+    
+    try:
+        all_results = embedding_manager.search_similar_startups_bulk(
+            queries, top_k=8, min_score=gemini_assistant.min_relevance_threshold
+        )
+        responses, job_name = gemini_assistant.submit_queries_batch(list(zip(queries, all_results)))
+        
+        return {
+            "job_name": job_name,
+            "results": [
+                {"query": query, "response": response, "results_count": len(results)}
+                for query, results, response in zip(queries, all_results, responses)
+            ]
+        }
+    except Exception as e:
+        logger.error("Bulk analyze error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/bulk-analyze/results")
+def bulk_analyze_results(job_name: str):
+    """Report a /bulk-analyze batch job's state and, once it has succeeded, its answers by query position."""
+    try:
+        state, responses = gemini_assistant.get_batch_results(job_name)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error("Bulk analyze results error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "job_name": job_name,
+        "state": state,
+        "done": state in BATCH_DONE_STATES,
+        "responses": responses
+    }
+
+@app.post("/search-startups-bulk")
+async def search_startups_bulk(requests: List[ChatRequest]):
+    """Answer several chat queries at once, with the Gemini calls running concurrently."""
+    queries = [r.query.strip() for r in requests if r.query.strip()]
+    if not queries:
+        raise HTTPException(status_code=400, detail="At least one non-empty query is required")
+    
+    try:
+        all_results = await asyncio.to_thread(
+            embedding_manager.search_similar_startups_bulk, queries, top_k=8,
+            min_score=gemini_assistant.min_relevance_threshold
+        )
+        responses = await gemini_assistant.process_queries(list(zip(queries, all_results)))
+        
+        return {
+            "results": [
+                {"query": query, "response": response, "results_count": len(results)}
+                for query, results, response in zip(queries, all_results, responses)
+            ]
+        }
+    except Exception as e:
+        logger.error("Bulk search error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/get-startup-column")
 def get_startup_column(req: ColumnRequest):
     """
@@ -487,7 +642,7 @@ def get_industry_competitors(req: CompetitorAnalysisRequest):
     Fetch top competitors from the same industry based on revenue and growth.
     """
     try:
-        print("Industry requested:", req.industry)
+        logger.debug("Industry requested: %s", req.industry)
         
         # Get a fresh connection since the global one might be closed
         local_conn, local_cursor = get_connection()
@@ -582,12 +737,13 @@ def get_industry_competitors(req: CompetitorAnalysisRequest):
             "city_distribution": city_counts
         }
     except Exception as e:
-        print(traceback.format_exc())
+        logger.error("Error fetching competitors: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching competitors: {str(e)}")
 
 # Add a shutdown event to close connection when app terminates
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
+    await close_search_client()
     if cursor:
         cursor.close()
     if conn:
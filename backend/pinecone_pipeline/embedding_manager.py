@@ -1,10 +1,28 @@
 import os
 import logging
 import datetime
-from typing import List, Dict, Any
+import functools
+import base64
+import gzip
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from typing import List, Dict, Any, Optional, Union, Tuple
 from dotenv import load_dotenv
 from sentence_transformers import SentenceTransformer
-from pinecone import Pinecone, ServerlessSpec
+from pinecone import ServerlessSpec, NotFoundException
+
+# Prefer the gRPC data plane (multiplexed, parallel upserts); fall back to REST
+try:
+    from pinecone.grpc import PineconeGRPC as Pinecone
+    GRPC_TRANSPORT = True
+except ImportError:
+    from pinecone import Pinecone
+    GRPC_TRANSPORT = False
 
 # Use absolute import instead of relative import
 try:
@@ -20,6 +38,185 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Vectors per Pinecone upsert request
+UPSERT_BATCH_SIZE = 100
+
+# Characters of the summary kept in Pinecone metadata for snippets
+TEXT_PREVIEW_CHARS = 300
+
+# Snowflake summary writes run here so they overlap with encoding and the Pinecone upsert
+_SNOWFLAKE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="snowflake-write")
+
+# Concurrent queries issued by search_similar_startups_bulk
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pinecone-search")
+
+# Search results kept per manager for repeated identical queries, and for how long (seconds)
+SEARCH_CACHE_SIZE = 1024
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "60"))
+
+# Reports-index queries run here, overlapping with the startup-index query of the same search
+_REPORTS_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pinecone-reports")
+
+# Seconds to wait for a background Snowflake write before treating it as failed
+SNOWFLAKE_WRITE_TIMEOUT = 60
+
+# Set once the startup index is known to exist, so later constructors skip the RPC
+_INDEX_READY = False
+
+# Dynamically INT8-quantized ONNX export shipped in the model repo
+ONNX_MODEL_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+
+def _load_sentence_model(model_name: str) -> SentenceTransformer:
+    """Load the encoder on ONNX Runtime with INT8 weights, falling back to PyTorch"""
+    try:
+        return SentenceTransformer(
+            model_name,
+            backend="onnx",
+            model_kwargs={"file_name": ONNX_MODEL_FILE}
+        )
+    except Exception as e:
+        # onnxruntime/optimum not installed or the export is missing
+        logger.info("ONNX backend unavailable, using PyTorch encoder: %s", e)
+        return SentenceTransformer(model_name)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Use every core for the PyTorch fallback; the default is often misconfigured in containers
+try:
+    import torch
+    torch.set_num_threads(os.cpu_count() or 1)
+except ImportError:
+    pass
+
+@functools.lru_cache(maxsize=1)
+def _get_model() -> SentenceTransformer:
+    """Load the Sentence Transformer once per process and share it across managers"""
+    return _load_sentence_model(MODEL_NAME)
+
+# On-disk embedding cache keyed by SHA-256 of the model name, encoder backend and input text
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache.sqlite3")
+)
+_cache_conn = None
+_cache_lock = threading.Lock()
+
+def _get_cache_conn() -> sqlite3.Connection:
+    """Open the embedding cache database once per process"""
+    global _cache_conn
+    if _cache_conn is None:
+        _cache_conn = sqlite3.connect(EMBEDDING_CACHE_PATH, check_same_thread=False)
+        _cache_conn.execute("CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vector BLOB)")
+    return _cache_conn
+
+def _compress_text(text: str) -> str:
+    """Gzip text and base64-encode it so it fits in a Pinecone string metadata field"""
+    return base64.b64encode(gzip.compress(text.encode("utf-8"))).decode("ascii")
+
+def _metadata_text(metadata: Dict[str, Any]) -> Optional[str]:
+    """Read the summary from metadata, whether stored compressed or as plain text"""
+    compressed = metadata.get("text_gz_b64")
+    if compressed:
+        return gzip.decompress(base64.b64decode(compressed)).decode("utf-8")
+    return metadata.get("text")
+
+def _encoder_backend(model: SentenceTransformer) -> str:
+    """Identify the loaded encoder weights; ONNX INT8 and PyTorch vectors differ slightly"""
+    return f"onnx:{ONNX_MODEL_FILE}" if getattr(model, "backend", "torch") == "onnx" else "torch"
+
+def _cache_key(text: str, backend: str) -> bytes:
+    return hashlib.sha256(f"{MODEL_NAME}\0{backend}\0{text}".encode("utf-8")).digest()
+
+def _encode_many_with_cache(texts: List[str]) -> np.ndarray:
+    """
+    Return normalized float32 embeddings for texts, one row per text.
+    Cached vectors are read in bulk; all misses are encoded in a single batched call.
+    """
+    model = _get_model()
+    # Vectors from the ONNX and PyTorch encoders never share cache entries
+    backend = _encoder_backend(model)
+    keys = [_cache_key(text, backend) for text in texts]
+    vectors = {}
+    
+    try:
+        with _cache_lock:
+            conn = _get_cache_conn()
+            unique_keys = list(dict.fromkeys(keys))
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ", ".join(["?"] * len(batch))
+                rows = conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vectors[key] = np.frombuffer(blob, dtype=np.float32)
+    except sqlite3.Error as e:
+        logger.warning("Embedding cache read failed: %s", e)
+    
+    # Deduplicate misses so each distinct text is encoded once
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            missing.setdefault(key, text)
+    
+    if missing:
+        # encode() sorts the batch by length internally, which minimises padding
+        encoded = np.asarray(
+            model.encode(
+                list(missing.values()),
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            ),
+            dtype=np.float32
+        )
+        vectors.update(zip(missing.keys(), encoded))
+        
+        try:
+            with _cache_lock:
+                conn = _get_cache_conn()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)",
+                    [(key, vectors[key].tobytes()) for key in missing]
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache write failed: %s", e)
+    
+    return np.stack([vectors[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+def _encode_with_cache(text: str) -> np.ndarray:
+    """Return the normalized float32 embedding for text, encoding only on a cache miss"""
+    return _encode_many_with_cache([text])[0]
+
+@functools.lru_cache(maxsize=4096)
+def _cached_encode(text: str) -> np.ndarray:
+    """Encode query text once; repeated queries are served from the cache"""
+    vector = _encode_with_cache(text)
+    vector.setflags(write=False)  # Shared between callers
+    return vector
+
+# Parallel requests per shared index connection
+INDEX_POOL_THREADS = 30
+
+@functools.lru_cache(maxsize=None)
+def _get_client(api_key: str) -> Pinecone:
+    """Create the Pinecone client once per API key and share it across managers"""
+    return Pinecone(api_key=api_key)
+
+@functools.lru_cache(maxsize=None)
+def _get_index(api_key: str, index_name: str):
+    """Open each index once per process so its connection pool is reused by every caller"""
+    return _get_client(api_key).Index(index_name, pool_threads=INDEX_POOL_THREADS)
+
+def _as_query_vector(embedding: np.ndarray):
+    """gRPC packs the float32 array directly; the REST client JSON-encodes and needs a list"""
+    return embedding if GRPC_TRANSPORT else embedding.tolist()
+
 class EmbeddingManager:
     """
     Class to manage embeddings for pitch deck summaries using a single chunk approach.
@@ -31,30 +228,41 @@ class EmbeddingManager:
         if not self.PINECONE_API_KEY:
             raise ValueError("PINECONE_API_KEY environment variable is not set")
         
-        # Initialize Pinecone
-        self.pc = Pinecone(api_key=self.PINECONE_API_KEY)
+        # Initialize Pinecone (client and index handles are shared process-wide)
+        self.pc = _get_client(self.PINECONE_API_KEY)
         self.index_name = "investor-intel"
         self.dimension = 384  # Matching the embedding model's output size
+        # Embeddings are L2-normalized at encode time, so dot product ranks like cosine
+        self.metric = "dotproduct"
+        # Constant unit vector for filter-only queries (non-zero so cosine indexes accept it)
+        self._probe_vector = [self.dimension ** -0.5] * self.dimension
         
-        # Check and create Pinecone index if it doesn't exist
-        existing_indexes = [index["name"] for index in self.pc.list_indexes()]
-        
-        if self.index_name not in existing_indexes:
+        # Connect to the index, creating it only if Pinecone reports it missing
+        global _INDEX_READY
+        try:
+            self.index = _get_index(self.PINECONE_API_KEY, self.index_name)
+            if not _INDEX_READY:
+                self.index.describe_index_stats()
+        except NotFoundException:
             self.pc.create_index(
                 name=self.index_name,
                 dimension=self.dimension,
-                metric="cosine",
+                metric=self.metric,
                 spec=ServerlessSpec(cloud="aws", region="us-east-1")
             )
-        else:
-            print(f"Index '{self.index_name}' already exists.")
+            _get_index.cache_clear()
+            self.index = _get_index(self.PINECONE_API_KEY, self.index_name)
+        _INDEX_READY = True
+        
+        # Reports index, opened through the same shared handle cache on first search
+        self.reports_index_name = "deloitte-reports"
         
-        # Connect to the index
-        self.index = self.pc.Index(self.index_name)
-        stats = self.index.describe_index_stats()
+        # Load Sentence Transformer Model (shared process-wide)
+        self.model = _get_model()
         
-        # Load Sentence Transformer Model
-        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        # LRU of (expiry, results) keyed by (query, industry, top_k, min_score); shared by request threads
+        self._search_cache = OrderedDict()
+        self._search_cache_lock = threading.Lock()
         
         print("Initializing Snowflake manager")
         # Initialize Snowflake manager
@@ -82,14 +290,15 @@ class EmbeddingManager:
             
         try:
             # Since Pinecone doesn't support case-insensitive search directly,
-            # we'll fetch all results and then compare case-insensitively
-            query_embedding = self.model.encode("dummy query for checking existence").tolist()
+            # we'll fetch all results and then compare case-insensitively.
+            # These are metadata lookups, so a fixed probe vector replaces a real embedding.
+            query_embedding = self._probe_vector
             
             # First try an exact match (for efficiency)
             exact_results = self.index.query(
                 vector=query_embedding,
                 top_k=1,
-                include_metadata=True,
+                include_metadata=False,
                 filter={"startup_name": {"$eq": startup_name}}
             )
             
@@ -111,13 +320,13 @@ class EmbeddingManager:
                 db_startup_name = metadata.get("startup_name", "")
                 
                 if db_startup_name.lower() == startup_name.lower():
-                    print(f"Found case-insensitive match: '{db_startup_name}' matches '{startup_name}'")
+                    logger.debug("Found case-insensitive match: '%s' matches '%s'", db_startup_name, startup_name)
                     return True
             
             return False
             
         except Exception as e:
-            print(f"Error checking if startup exists: {e}", exc_info=True)
+            logger.error("Error checking if startup exists: %s", e, exc_info=True)
             return False
     
     def store_summary_embeddings(self, 
@@ -129,18 +338,119 @@ class EmbeddingManager:
                                original_filename: str,
                                s3_location: str) -> bool:
         """Store the summary as a single chunk in both Pinecone and Snowflake"""
-        print(f"Storing data for {startup_name} pitch deck")
+        return self.store_summary_embeddings_bulk([{
+            "summary": summary,
+            "startup_name": startup_name,
+            "industry": industry,
+            "website_url": website_url,
+            "linkedin_urls": linkedin_urls,
+            "original_filename": original_filename,
+            "s3_location": s3_location
+        }])[0]
+    
+    def store_summary_embeddings_bulk(self, items: List[Dict[str, Any]], return_metadata: bool = False) -> List[Any]:
+        """
+        Store many summaries, upserting to Pinecone in parallel batches.
+        
+        Args:
+            items: Dicts with the keyword arguments of store_summary_embeddings
+            return_metadata: Return each stored record's metadata instead of a success flag,
+                so callers can read e.g. snowflake_status without querying the index again
+            
+        Returns:
+            List: Per-item success (bool), or stored metadata / None with return_metadata, in the order of items
+        """
+        failed = None if return_metadata else False
+        statuses = [failed] * len(items)
+        vectors = []
+        vector_positions = []
+        snowflake_rows = []
+        
+        # Several summaries go to Snowflake in one statement instead of one write each
+        batch_snowflake = self.snowflake_manager is not None and len(items) > 1
+        for position, item in enumerate(items):
+            vector = self._prepare_summary_vector(**item, write_snowflake=not batch_snowflake)
+            if vector is not None:
+                vectors.append(vector)
+                vector_positions.append(position)
+                snowflake_rows.append(item)
+        
+        if batch_snowflake and vectors:
+            try:
+                snowflake_future = _SNOWFLAKE_EXECUTOR.submit(self.snowflake_manager.store_startup_summaries, snowflake_rows)
+            except Exception as e:
+                logger.warning("Failed to store in Snowflake, continuing with Pinecone storage: %s", e)
+                snowflake_future = None
+            for vector in vectors:
+                vector["snowflake_future"] = snowflake_future
+        
+        # Encode all summaries in one batch while the Snowflake writes run in the background;
+        # Pinecone unboxes the ndarray rows itself
+        if vectors:
+            summaries = [vector.pop("summary") for vector in vectors]
+            try:
+                embeddings = self.encode_many(summaries)
+            except Exception as e:
+                logger.error("Error generating embeddings: %s", e, exc_info=True)
+                return statuses
+            for vector, summary, embedding in zip(vectors, summaries, embeddings):
+                vector["values"] = embedding
+                self._apply_snowflake_result(vector, summary)
+        
+        # Issue every batch before waiting on any of them
+        pending = []
+        for start in range(0, len(vectors), UPSERT_BATCH_SIZE):
+            batch = vectors[start:start + UPSERT_BATCH_SIZE]
+            try:
+                pending.append((start, len(batch), self.index.upsert(vectors=batch, async_req=True)))
+            except Exception as e:
+                logger.error("Error submitting Pinecone upsert batch: %s", e, exc_info=True)
+        
+        for start, size, request in pending:
+            try:
+                # gRPC returns a future, REST an AsyncResult
+                if hasattr(request, "result"):
+                    request.result()
+                else:
+                    request.get()
+            except Exception as e:
+                logger.error("Error storing data in Pinecone: %s", e, exc_info=True)
+                continue
+            for offset, position in enumerate(vector_positions[start:start + size]):
+                statuses[position] = vectors[start + offset]["metadata"] if return_metadata else True
+        
+        # Newly stored startups must show up in searches right away
+        if any(statuses):
+            with self._search_cache_lock:
+                self._search_cache.clear()
         
+        logger.info("Stored %d of %d summaries in Pinecone", sum(1 for status in statuses if status), len(items))
+        return statuses
+    
+    def _prepare_summary_vector(self,
+                                summary: str,
+                                startup_name: str,
+                                industry: str,
+                                website_url: str,
+                                linkedin_urls: List[str],
+                                original_filename: str,
+                                s3_location: str,
+                                write_snowflake: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Start the Snowflake write and build the summary's Pinecone record (without values), or None to skip it.
+        With write_snowflake=False the caller writes to Snowflake itself and sets the record's snowflake_future.
+        """
         # First check if the startup already exists (case-insensitive)
         if self.check_startup_exists(startup_name):
-            print(f"Startup {startup_name} already exists in the database (case-insensitive match)")
-            return False
+            logger.info("Startup %s already exists in the database (case-insensitive match)", startup_name)
+            return None
         
-        # Store in Snowflake first if available
-        snowflake_success = False
-        if self.snowflake_manager:
+        # Write to Snowflake in the background; the result is collected after encoding
+        snowflake_future = None
+        if self.snowflake_manager and write_snowflake:
             try:
-                startup_name = self.snowflake_manager.store_startup_summary(
+                snowflake_future = _SNOWFLAKE_EXECUTOR.submit(
+                    self.snowflake_manager.store_startup_summary,
                     startup_name=startup_name,
                     summary=summary,
                     industry=industry,
@@ -148,25 +458,15 @@ class EmbeddingManager:
                     s3_location=s3_location,
                     original_filename=original_filename
                 )
-                print(f"Stored summary in Snowflake for: {startup_name}")
-                snowflake_success = True
             except Exception as e:
-                print(f"Failed to store in Snowflake: {e}")
-                print("Continuing with Pinecone storage despite Snowflake error")
+                logger.warning("Failed to store in Snowflake, continuing with Pinecone storage: %s", e)
         
         try:
             # Current timestamp for the upload
             timestamp = datetime.datetime.now().isoformat()
-            print(f"Upload timestamp: {timestamp}")
             
             # Generate a unique ID for this record
             unique_id = f"{startup_name.replace(' ', '_')}_{timestamp}"
-            print(f"Creating embedding with ID: {unique_id}")
-            
-            # Generate embedding for the content
-            print(f"Generating embedding")
-            embedding = self.model.encode(summary).tolist()
-            print(f"Generated embedding with {len(embedding)} dimensions")
             
             # Prepare metadata
             metadata = {
@@ -177,44 +477,170 @@ class EmbeddingManager:
                 "s3_location": s3_location,
                 "upload_timestamp": timestamp,
                 "invested": "no",  # Default to 'no' as specified
-                "text": summary,  # Store the complete summary
-                "snowflake_status": "success" if snowflake_success else "skipped" 
+                "snowflake_status": "skipped"
             }
             
-            # Log metadata for debugging
-            print(f"Metadata: startup={startup_name}, industry={industry}")
-            
-            # Insert into Pinecone
-            print(f"Inserting into Pinecone with ID: {unique_id}")
-            self.index.upsert([(unique_id, embedding, metadata)])
-            print(f"Successfully inserted into Pinecone")
-            
-            return True
+            # Values are filled in by one batched encode across all summaries
+            return {
+                "id": unique_id,
+                "values": None,
+                "metadata": metadata,
+                "summary": summary,
+                "snowflake_future": snowflake_future
+            }
         
         except Exception as e:
-            print(f"Error storing data in Pinecone: {e}", exc_info=True)
-            return False
+            logger.error("Error preparing embedding for %s: %s", startup_name, e, exc_info=True)
+            return None
     
-    def search_similar_startups(self, query: str, industry: str = None, top_k: int = 5):
+    def _apply_snowflake_result(self, vector: Dict[str, Any], summary: str) -> None:
+        """
+        Wait for the record's background Snowflake write and set its metadata accordingly.
+        
+        Args:
+            vector: Pinecone record built by _prepare_summary_vector
+            summary: Full summary text of the record
+        """
+        snowflake_future = vector.pop("snowflake_future", None)
+        metadata = vector["metadata"]
+        stored = False
+        if snowflake_future is not None:
+            try:
+                # A startup name for single writes, the list of names written for batched ones
+                written = snowflake_future.result(timeout=SNOWFLAKE_WRITE_TIMEOUT)
+                if isinstance(written, list):
+                    stored = metadata["startup_name"] in written
+                else:
+                    stored = written == metadata["startup_name"]
+                if not stored:
+                    logger.warning("No Snowflake row for %s, keeping the full summary in Pinecone", metadata["startup_name"])
+            except Exception as e:
+                logger.warning("Failed to store in Snowflake, continuing with Pinecone storage: %s", e)
+        
+        if not stored:
+            # No Snowflake copy, store the complete summary (gzipped to cut payload size)
+            metadata["text_gz_b64"] = _compress_text(summary)
+            return
+        
+        # The full summary lives in Snowflake (keyed by startup name, for single and batched writes);
+        # keep only a pointer and a short preview
+        metadata["snowflake_status"] = "success"
+        metadata["snowflake_id"] = metadata["startup_name"]
+        metadata["text_preview"] = summary[:TEXT_PREVIEW_CHARS]
+    
+    def encode_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed several texts with one batched, length-sorted encode call.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            np.ndarray: Normalized float32 embeddings, one row per text
+        """
+        return _encode_many_with_cache(list(texts))
+    
+    def search_similar_startups(self, query: Union[str, List[str]], industry: str = None, top_k: int = 5,
+                                min_score: Optional[float] = None):
         """
         Search for similar content based on a query and optional filters.
         Searches both the investor-intel (startups) and deloitte-reports indexes simultaneously.
         
         Args:
-            query: The search query text
+            query: The search query text, or a list of queries to embed in one batch
             industry: Filter by industry category (optional)
             top_k: Number of results to return from each index
+            min_score: Drop matches scoring below this before they are processed (optional)
             
         Returns:
-            List of dictionary results with combined information from both indexes
+            List of dictionary results with combined information from both indexes,
+            or one such list per query when a list of queries is given
         """
-        print(f"Searching for information with query: '{query}'")
-        print(f"Filters - Industry: {industry}, Top K: {top_k}")
+        if isinstance(query, str):
+            cache_key = (query, industry, top_k, min_score)
+            cached_results = self._get_cached_search(cache_key)
+            if cached_results is not None:
+                return cached_results
+            
+            # Generate embedding for the query (cached per query text)
+            results, complete = self._search_with_embedding(query, _as_query_vector(_cached_encode(query)), industry, top_k, min_score)
+            # Partial results from a failed index or Snowflake lookup are retried next time
+            if complete:
+                self._cache_search(cache_key, results)
+            return results
         
-        try:
-            # Generate embedding for the query
-            query_embedding = self.model.encode(query).tolist()
+        return self.search_similar_startups_bulk(query, industry, top_k, min_score)
+    
+    def search_similar_startups_bulk(self, queries: List[str], industry: str = None, top_k: int = 5,
+                                     min_score: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for many queries at once: one batched encode, then the Pinecone queries in parallel.
+        
+        Args:
+            queries: Search query texts
+            industry: Filter by industry category (optional)
+            top_k: Number of results to return from each index
+            min_score: Drop matches scoring below this before they are processed (optional)
             
+        Returns:
+            List of result lists, in the order of queries
+        """
+        queries = list(queries)
+        results = [self._get_cached_search((query, industry, top_k, min_score)) for query in queries]
+        misses = [i for i, cached_results in enumerate(results) if cached_results is None]
+        if not misses:
+            return results
+        
+        try:
+            # encode() length-sorts the batch and restores caller order, minimising padding
+            query_embeddings = self.encode_many([queries[i] for i in misses])
+        except Exception as e:
+            logger.error("Error in search_similar_startups_bulk: %s", e, exc_info=True)
+            return [[] if r is None else r for r in results]
+        
+        searched = _SEARCH_EXECUTOR.map(
+            lambda pair: self._search_with_embedding(queries[pair[0]], _as_query_vector(pair[1]), industry, top_k, min_score),
+            zip(misses, query_embeddings)
+        )
+        for i, (query_results, complete) in zip(misses, searched):
+            results[i] = query_results
+            if complete:
+                self._cache_search((queries[i], industry, top_k, min_score), query_results)
+        return results
+    
+    def _get_cached_search(self, cache_key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of unexpired cached search results for cache_key, or None"""
+        with self._search_cache_lock:
+            entry = self._search_cache.get(cache_key)
+            if entry is None:
+                return None
+            expires_at, results = entry
+            if expires_at < time.monotonic():
+                del self._search_cache[cache_key]
+                return None
+            self._search_cache.move_to_end(cache_key)
+            return list(results)
+    
+    def _cache_search(self, cache_key: tuple, results: List[Dict[str, Any]]) -> None:
+        """Store search results, evicting the least recently used entry when full"""
+        with self._search_cache_lock:
+            self._search_cache[cache_key] = (time.monotonic() + SEARCH_CACHE_TTL, list(results))
+            self._search_cache.move_to_end(cache_key)
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+    
+    def _search_with_embedding(self, query: str, query_embedding, industry: str, top_k: int,
+                               min_score: Optional[float] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Run the combined startup/report search for one already-embedded query.
+        
+        Returns:
+            Tuple of the results and whether every lookup (both indexes and Snowflake) succeeded
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Searching with query: '%s' (industry=%s, top_k=%s)", query, industry, top_k)
+        
+        try:
             # Prepare filter if industry filter is provided
             filter_dict = {}
             if industry:
@@ -222,6 +648,17 @@ class EmbeddingManager:
             
             # Initialize combined results list
             processed_results = []
+            complete = True
+            
+            # Start the reports-index query now so both indexes are searched in one round trip
+            deloitte_future = _REPORTS_QUERY_EXECUTOR.submit(
+                lambda: _get_index(self.PINECONE_API_KEY, self.reports_index_name).query(
+                    vector=query_embedding,
+                    top_k=top_k,
+                    include_metadata=True,
+                    filter=filter_dict if filter_dict else None
+                )
+            )
             
             # SEARCH 1: Search in the investor-intel index (startup information)
             try:
@@ -235,6 +672,9 @@ class EmbeddingManager:
                 # Process startup results
                 startup_matches = startup_results.get("matches", [])
                 for match in startup_matches:
+                    # Matches come back best first, so the first one below min_score ends the list
+                    if min_score is not None and match["score"] < min_score:
+                        break
                     metadata = match["metadata"]
                     score = match["score"]
                     
@@ -249,32 +689,28 @@ class EmbeddingManager:
                         "linkedin_urls": metadata.get("linkedin_urls", ""),
                         "original_filename": metadata.get("original_filename", ""),
                         "upload_timestamp": metadata.get("upload_timestamp", ""),
-                        "text": metadata.get("text", "No content available"),
+                        "text": _metadata_text(metadata),
+                        "snowflake_id": metadata.get("snowflake_id"),
+                        "text_preview": metadata.get("text_preview", ""),
                         "snowflake_status": metadata.get("snowflake_status", "unknown")
                     }
                     processed_results.append(result)
                 
-                print(f"Found {len(startup_matches)} results in investor-intel index")
                 
             except Exception as e:
-                print(f"Error searching startup index: {e}", exc_info=True)
+                logger.error("Error searching startup index: %s", e, exc_info=True)
+                complete = False
             
             # SEARCH 2: Search in the deloitte-reports index (industry reports)
             try:
-                # Connect to the deloitte-reports index
-                deloitte_index = self.pc.Index("deloitte-reports")
-                
-                # Search in the deloitte-reports index
-                deloitte_results = deloitte_index.query(
-                    vector=query_embedding,
-                    top_k=top_k,
-                    include_metadata=True,
-                    filter=filter_dict if filter_dict else None
-                )
+                # Collect the deloitte-reports query started above
+                deloitte_results = deloitte_future.result()
                 
                 # Process deloitte report results
                 deloitte_matches = deloitte_results.get("matches", [])
                 for match in deloitte_matches:
+                    if min_score is not None and match["score"] < min_score:
+                        break
                     metadata = match["metadata"]
                     score = match["score"]
                     
@@ -291,10 +727,10 @@ class EmbeddingManager:
                     }
                     processed_results.append(result)
                 
-                print(f"Found {len(deloitte_matches)} results in deloitte-reports index")
                 
             except Exception as e:
-                print(f"Error searching deloitte-reports index: {e}", exc_info=True)
+                logger.error("Error searching deloitte-reports index: %s", e, exc_info=True)
+                complete = False
             
             # Sort all results by score (descending) to get best matches first
             processed_results.sort(key=lambda x: x.get('score', 0), reverse=True)
@@ -302,8 +738,53 @@ class EmbeddingManager:
             # Limit to top_k total results across both indexes
             processed_results = processed_results[:top_k]
             
-            return processed_results
+            # Fetch full summaries from Snowflake only for the results we return
+            if not self._hydrate_startup_text(processed_results):
+                complete = False
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Search returned %d results", len(processed_results))
+            
+            return processed_results, complete
         
         except Exception as e:
-            print(f"Error in search_similar_startups: {e}", exc_info=True)
-            return []
\ No newline at end of file
+            logger.error("Error in search_similar_startups: %s", e, exc_info=True)
+            return [], False
+    
+    def _hydrate_startup_text(self, results: List[Dict[str, Any]]) -> bool:
+        """
+        Fill in the summary text for startup results whose metadata only holds a Snowflake pointer.
+        Resolves all pointers with a single Snowflake query; falls back to the stored preview.
+        
+        Args:
+            results: Processed search results, updated in place
+            
+        Returns:
+            bool: False if the Snowflake lookup failed and previews were used instead
+        """
+        pending = [r for r in results if r.get("source") == "startup" and not r.get("text")]
+        if not pending:
+            return True
+        
+        summaries = {}
+        fetched = True
+        snowflake_ids = [r["snowflake_id"] for r in pending if r.get("snowflake_id")]
+        if snowflake_ids and self.snowflake_manager:
+            try:
+                summaries = self.snowflake_manager.get_startup_summaries(snowflake_ids)
+            except Exception as e:
+                logger.warning("Failed to fetch summaries from Snowflake: %s", e)
+                fetched = False
+        
+        for result in pending:
+            result["text"] = (
+                summaries.get(result.get("snowflake_id"))
+                or result.get("text_preview")
+                or "No content available"
+            )
+        return fetched
+
+@functools.lru_cache(maxsize=None)
+def get_embedding_manager() -> EmbeddingManager:
+    """Build the process-wide EmbeddingManager on first use; every app module shares it"""
+    return EmbeddingManager()
@@ -1,14 +1,138 @@
 import os
-import traceback
+import asyncio
+import time
+import tempfile
+import logging
 import json
-from typing import List, Dict, Any, Optional
+import hashlib
+import threading
+import datetime
+import functools
+from collections import OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 import google.generativeai as genai
+from google.generativeai import caching
 from dotenv import load_dotenv
 import re
 
+# Google GenAI SDK, only needed for the Batch API
+try:
+    from google import genai as genai_sdk
+except ImportError:
+    genai_sdk = None
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Returned without calling Gemini when the search produced nothing to answer from
+NO_CONTEXT_RESPONSE = "No relevant results were indexed for this query."
+
+# Number of generated answers kept in the per-assistant response cache, and for how long (seconds)
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = int(os.getenv("GEMINI_CACHE_TTL", "3600"))
+
+# Stray "(Result #3)" / "(Source 2)" citations, stripped in a single pass
+RESULT_REFERENCE_PATTERN = re.compile(r'\((?:Result #|Source )\d+\)')
+
+# Fixed instructions, sent once as the model's system instruction instead of inside every prompt
+SYSTEM_PROMPT = (
+    "You assist venture capitalists. Answer only from the provided search results (<doc> elements), "
+    "synthesizing across sources. "
+    "Be concise and investment-focused: for startups cover business model, market and edge; "
+    "for industry reports cover trends, forecasts and key insights. "
+    "If the results do not answer the question, say so."
+)
+
+# Answers are capped and returned as a JSON list of bullets, rendered locally as "• " lines
+MAX_OUTPUT_TOKENS = 384
+ANSWER_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"bullets": {"type": "ARRAY", "items": {"type": "STRING"}}},
+    "required": ["bullets"]
+}
+ANSWER_GENERATION_CONFIG = {
+    "max_output_tokens": MAX_OUTPUT_TOKENS,
+    "response_mime_type": "application/json",
+    "response_schema": ANSWER_SCHEMA
+}
+# Streaming renders text as it arrives, so it stays plain text
+STREAM_GENERATION_CONFIG = {"max_output_tokens": MAX_OUTPUT_TOKENS}
+
+# Explicit context cache of the most frequently returned results: rebuilt every
+# CONTEXT_CACHE_REFRESH_QUERIES queries from the top CONTEXT_CACHE_MAX_RESULTS results
+CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+CONTEXT_CACHE_REFRESH_QUERIES = 200
+CONTEXT_CACHE_MAX_RESULTS = 50
+
+# The pinned context is no longer used this many seconds before Gemini expires it
+CONTEXT_CACHE_EXPIRY_MARGIN = 60
+
+# Rebuilds the pinned context in the background, so no user request waits on the upload
+_PIN_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gemini-context-cache")
+
+# Optional per-request deadline (seconds) for Gemini calls; unset keeps the SDK default
+GEMINI_REQUEST_TIMEOUT = os.getenv("GEMINI_REQUEST_TIMEOUT")
+
+# Concurrent Gemini requests allowed when answering several queries at once
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "16"))
+
+# Batch request files go to tmpfs when the host has one, avoiding a disk write and sync
+TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Seconds between status checks of a submitted batch job
+BATCH_POLL_SECONDS = 30
+
+# Longest process_queries_batch waits for its job before cancelling it (batch jobs may take hours)
+BATCH_MAX_WAIT_SECONDS = int(os.getenv("GEMINI_BATCH_MAX_WAIT", "1800"))
+
+# Response returned for a query whose Gemini call or batch request failed
+ERROR_RESPONSE = "I'm unable to process this request at the moment. Please try again with a different question."
+
+# Terminal states of a Gemini batch job
+BATCH_DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+# Start of the bullet list in a structured answer, and each complete JSON string after it
+# (used to salvage answers cut off at max_output_tokens)
+BULLETS_START_PATTERN = re.compile(r'"bullets"\s*:\s*\[')
+JSON_STRING_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+# Leading/trailing whitespace of every line
+LINE_EDGE_WHITESPACE_PATTERN = re.compile(r'^[^\S\n]+|[^\S\n]+$', re.MULTILINE)
+
+# '*' or '-' bullet at the start of a line, with the spacing after it
+LEADING_BULLET_PATTERN = re.compile(r'^[*-][^\S\n]*', re.MULTILINE)
+
+# A bullet marker that does not start its line
+INLINE_BULLET_PATTERN = re.compile(r'(?<=[^\n])• ')
+
+# Three or more consecutive line breaks
+EXTRA_NEWLINES_PATTERN = re.compile(r'\n{3,}')
+
+# Common introductory phrases Gemini opens with, stripped from the start of responses
+RESPONSE_INTROS = [
+    "Based on the provided search results:",
+    "Based on the search results provided:",
+    "Here's the information from the search results:",
+    "According to the search results:",
+    "Here's what I found in the search results:",
+    "From the search results:",
+    ", here's the information about",
+    ", here's what is known about",
+    "The search results indicate that",
+    "The information available from the search results shows"
+]
+INTRO_PATTERN = re.compile(
+    r'^(?:' + '|'.join(map(re.escape, RESPONSE_INTROS)) + r')\s*', re.IGNORECASE
+)
+
+def _strip_intro(text: str) -> str:
+    """Drop a leading introductory phrase; only the prefix of text is examined"""
+    intro = INTRO_PATTERN.match(text)
+    return text[intro.end():] if intro else text
+
 class GeminiAssistant:
     """
     A class that processes user queries and Pinecone search results with Gemini 2.0
@@ -30,14 +154,32 @@ class GeminiAssistant:
         # Minimum relevance threshold
         self.min_relevance_threshold = 0.2
         
+        # Request options passed to every Gemini call
+        self.request_options = {"timeout": float(GEMINI_REQUEST_TIMEOUT)} if GEMINI_REQUEST_TIMEOUT else {}
+        
+        # LRU of (expiry, answer) keyed by (query, result ids); shared by request threads
+        self._response_cache = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        
+        # Result usage counts and the pinned (explicitly cached) context built from the hottest results;
+        # request threads and the refresh thread share them under _pin_lock
+        self._pin_lock = threading.Lock()
+        self._result_hits = Counter()
+        self._seen_results = {}
+        self._queries_since_pin = 0
+        self._pin_refreshing = False
+        self._pinned_cache = None
+        self._pinned_model = None
+        self._pinned_ids = frozenset()
+        self._pinned_expires_at = 0.0
+        
         # Configure the Gemini API
         try:
             genai.configure(api_key=self.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel(self.model_name)
-            print(f"Gemini API configured successfully with model: {self.model_name}")
+            self.model = genai.GenerativeModel(self.model_name, system_instruction=SYSTEM_PROMPT)
+            logger.info("Gemini API configured successfully with model: %s", self.model_name)
         except Exception as e:
-            print(f"Failed to configure Gemini API: {str(e)}")
-            print(traceback.format_exc())
+            logger.error("Failed to configure Gemini API: %s", e, exc_info=True)
             raise Exception(f"Failed to configure Gemini API: {str(e)}")
     
     def process_query_with_results(self, query: str, search_results: list):
@@ -51,117 +193,561 @@ class GeminiAssistant:
         Returns:
             Generated response from Gemini
         """
-        # Format the context based on the result sources
-        formatted_context = []
+        # Nothing relevant to ground an answer in: skip the API call entirely
+        if not self._has_context(search_results):
+            return NO_CONTEXT_RESPONSE
         
-        # Count sources to inform the model what kind of data we're presenting
-        startup_count = sum(1 for r in search_results if r.get("source") == "startup")
-        report_count = sum(1 for r in search_results if r.get("source") == "deloitte-report")
+        # Identical query over the same results: reuse the earlier answer
+        cache_key = self._response_cache_key(query, search_results)
+        cached_response = self._get_cached_response(cache_key)
+        if cached_response is not None:
+            return cached_response
         
-        # Add a context header to help the model understand the data
-        if startup_count > 0 and report_count > 0:
-            formatted_context.append(
-                f"The following information comes from both startup data ({startup_count} results) and " +
-                f"Deloitte industry reports ({report_count} results):"
-            )
-        elif startup_count > 0:
-            formatted_context.append(f"The following information comes from startup data ({startup_count} results):")
-        elif report_count > 0:
-            formatted_context.append(f"The following information comes from Deloitte industry reports ({report_count} results):")
-        
-        # Process and format each result
-        for i, result in enumerate(search_results):
-            if result.get("source") == "startup":
-                # Format startup data
-                formatted_context.append(
-                    f"Result #{i+1} (Startup): {result.get('startup_name', 'Unnamed Startup')}\n" +
-                    f"Industry: {result.get('industry', 'Unknown')}\n" +
-                    f"Content: {result.get('text', 'No information available')}\n"
-                )
-            elif result.get("source") == "deloitte-report":
-                # Format Deloitte report data
-                formatted_context.append(
-                    f"Result #{i+1} (Industry Report): {result.get('report_title', 'Untitled Report')}\n" +
-                    f"Industry: {result.get('industry', 'Unknown')}\n" +
-                    f"Year: {result.get('year', 'Unknown')}\n" +
-                    f"Content: {result.get('text', 'No information available')}\n"
-                )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Answering %r from %d search results", query, len(search_results))
+            for r in search_results:
+                logger.debug("  %s (score %s): %.100s", r.get("id"), r.get("score"), r.get("text", ""))
         
-        # Join all context pieces with separators
-        context_text = "\n\n".join(formatted_context)
+        # Generate content with Gemini, from the pinned context when it covers every result
+        result_ids = {str(r.get("id", "")) for r in search_results}
+        pinned_model = self._live_pinned_model(result_ids)
+        self._track_results(search_results)
+        try:
+            response = None
+            if pinned_model is not None:
+                try:
+                    response = pinned_model.generate_content(
+                        f"QUERY: {query}\n\nAnswer from the pinned search results with ids: {', '.join(sorted(result_ids))}",
+                        generation_config=ANSWER_GENERATION_CONFIG,
+                        request_options=self.request_options
+                    )
+                except Exception as e:
+                    # E.g. the cache was expired or deleted on Google's side; answer with inline context
+                    logger.warning("Pinned context call failed, falling back to inline context: %s", e)
+                    self._drop_pinned_context(pinned_model)
+            if response is None:
+                response = self.model.generate_content(
+                    [
+                        {"role": "user", "parts": [self._build_prompt(query, search_results)]}
+                    ],
+                    generation_config=ANSWER_GENERATION_CONFIG,
+                    request_options=self.request_options
+                )
+            
+            answer = self._render_answer(response.text)
+            self._cache_response(cache_key, answer)
+            return answer
+        except Exception as e:
+            logger.error("Error generating Gemini response: %s", e)
+            return ERROR_RESPONSE
+    
+    async def process_query_with_results_stream(self, query: str, search_results: list) -> AsyncIterator[str]:
+        """
+        Streaming variant of process_query_with_results that yields text chunks as Gemini produces them.
         
-        # Prepare system prompt
-        system_prompt = """
-        You are an AI assistant for venture capitalists and investors. 
-        When answering questions, use the provided search results to inform your responses.
-        Provide factual, accurate information based directly on the search results.
-        If the information comes from multiple sources, synthesize it coherently.
+        Args:
+            query: The query string
+            search_results: List of search results from both startup data and report data
         
-        Guidelines:
-        - Cite specific sources when providing information (e.g., "According to Result #3...")
-        - If a question can't be answered with the provided results, say so clearly
-        - Be concise and focus on investment-relevant points
-        - For startups, highlight business model, market potential, and competitive advantages
-        - For industry reports, focus on market trends, growth forecasts, and key insights
+        Yields:
+            str: Successive pieces of the generated response
         """
+        if not self._has_context(search_results):
+            yield NO_CONTEXT_RESPONSE
+            return
+        
+        cache_key = self._response_cache_key(query, search_results)
+        cached_response = self._get_cached_response(cache_key)
+        if cached_response is not None:
+            yield self._clean_response_format(cached_response)
+            return
         
-        # Generate content with Gemini
         try:
-            # Combine system prompt with user query since Gemini doesn't support system messages
-            combined_prompt = f"""
-            {system_prompt}
+            response = await self.model.generate_content_async(
+                [
+                    {"role": "user", "parts": [self._build_prompt(query, search_results)]}
+                ],
+                stream=True,
+                generation_config=STREAM_GENERATION_CONFIG,
+                request_options=self.request_options
+            )
             
-            Based on the following search results, please answer this question: {query}
+            # Clean and flush complete lines as they arrive; hold back the unfinished last line
+            parts = []
+            pending = ""
+            first_block = True
+            async for chunk in response:
+                pending += chunk.text
+                cut = pending.rfind("\n")
+                if cut < 0:
+                    continue
+                block, pending = pending[:cut + 1], pending[cut + 1:]
+                block = self._clean_stream_block(block, first_block)
+                first_block = False
+                if block:
+                    parts.append(block)
+                    yield block
             
-            {context_text}
-            """
+            tail = self._clean_stream_block(pending, first_block).rstrip()
+            if tail:
+                parts.append(tail)
+                yield tail
             
-            response = self.model.generate_content(
-                [
-                    {"role": "user", "parts": [combined_prompt]}
-                ]
-            )
-            return response.text
+            # Cache the cleaned text, since /chat returns cached answers as they are
+            self._cache_response(cache_key, "".join(parts).strip())
         except Exception as e:
-            print(f"Error generating Gemini response: {e}")
-            return "I'm unable to process this request at the moment. Please try again with a different question."
+            logger.error("Error streaming Gemini response: %s", e)
+            yield ERROR_RESPONSE
     
-    def _format_search_results(self, search_results: List[Dict[str, Any]]) -> str:
+    def submit_queries_batch(self, pairs: List[Tuple[str, list]]) -> Tuple[List[Optional[str]], Optional[str]]:
         """
-        Format search results from Pinecone into a context string for Gemini.
+        Answer what can be answered locally and submit the rest as one Gemini Batch API job, without waiting.
+        Batch requests are billed at half price; collect their answers later with get_batch_results.
         
         Args:
-            search_results: List of search results from Pinecone
+            pairs: (query, search_results) tuples
             
         Returns:
-            str: Formatted context string
+            Tuple of the responses (None where the batch job answers) and the batch job name (None if nothing was submitted)
         """
-        formatted_results = []
+        responses = [None] * len(pairs)
+        prompts = {}
+        
+        # Answer empty-context and cached pairs locally; only the rest go into the batch
+        for i, (query, search_results) in enumerate(pairs):
+            if not self._has_context(search_results):
+                responses[i] = NO_CONTEXT_RESPONSE
+                continue
+            cache_key = self._response_cache_key(query, search_results)
+            cached_response = self._get_cached_response(cache_key)
+            if cached_response is not None:
+                responses[i] = cached_response
+            else:
+                # The key carries the pair's position and cache key, so results can be mapped back by any worker
+                prompts[f"q_{i}_{cache_key.hex()}"] = self._build_prompt(query, search_results)
+        
+        if not prompts:
+            return responses, None
         
+        if genai_sdk is None:
+            logger.info("google-genai is not installed, answering batch queries one by one")
+            for key in prompts:
+                i = int(key.split("_")[1])
+                responses[i] = self.process_query_with_results(*pairs[i])
+            return responses, None
+        
+        return responses, self._submit_batch_job(prompts)
+    
+    def get_batch_results(self, job_name: str) -> Tuple[str, Optional[Dict[int, str]]]:
+        """
+        Check a batch job submitted by submit_queries_batch and collect its answers once it has succeeded.
+        
+        Args:
+            job_name: Name returned by submit_queries_batch
+            
+        Returns:
+            Tuple of the job state and, for a succeeded job, the response text by pair position
+            
+        Raises:
+            NotImplementedError: If google-genai is not installed, so no batch job can be checked
+        """
+        if genai_sdk is None:
+            raise NotImplementedError("google-genai is not installed, so Gemini batch jobs are unavailable")
+        
+        client = genai_sdk.Client(api_key=self.GEMINI_API_KEY)
+        job = client.batches.get(name=job_name)
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            return job.state.name, None
+        
+        responses = {}
+        for key, text in self._download_batch_results(client, job).items():
+            _, position, cache_key = key.split("_")
+            responses[int(position)] = text
+            self._cache_response(bytes.fromhex(cache_key), text)
+        return job.state.name, responses
+    
+    def process_queries_batch(self, pairs: List[Tuple[str, list]], max_wait: int = BATCH_MAX_WAIT_SECONDS) -> List[str]:
+        """
+        Answer many (query, search_results) pairs through the Gemini Batch API and wait for the answers.
+        Intended for offline scripts; the job is cancelled after max_wait seconds.
+        
+        Args:
+            pairs: (query, search_results) tuples
+            max_wait: Longest time (seconds) to wait for the batch job
+            
+        Returns:
+            List[str]: One response per pair, in the order of pairs
+        """
+        try:
+            responses, job_name = self.submit_queries_batch(pairs)
+        except Exception as e:
+            logger.error("Error submitting Gemini batch job: %s", e, exc_info=True)
+            return [ERROR_RESPONSE] * len(pairs)
+        
+        if job_name is not None:
+            deadline = time.monotonic() + max_wait
+            try:
+                state, batch_responses = self.get_batch_results(job_name)
+                while state not in BATCH_DONE_STATES and time.monotonic() < deadline:
+                    time.sleep(BATCH_POLL_SECONDS)
+                    state, batch_responses = self.get_batch_results(job_name)
+                
+                if state not in BATCH_DONE_STATES:
+                    logger.error("Gemini batch job %s did not finish within %ss, cancelling it", job_name, max_wait)
+                    genai_sdk.Client(api_key=self.GEMINI_API_KEY).batches.cancel(name=job_name)
+                elif batch_responses is None:
+                    logger.error("Gemini batch job %s ended in state %s", job_name, state)
+                else:
+                    for i, text in batch_responses.items():
+                        responses[i] = text
+            except Exception as e:
+                logger.error("Error running Gemini batch job: %s", e, exc_info=True)
+        
+        return [ERROR_RESPONSE if response is None else response for response in responses]
+    
+    async def process_queries(self, pairs: List[Tuple[str, list]]) -> List[str]:
+        """
+        Answer many (query, search_results) pairs concurrently, at most GEMINI_CONCURRENCY at a time.
+        
+        Args:
+            pairs: (query, search_results) tuples
+            
+        Returns:
+            List[str]: One response per pair, in the order of pairs
+        """
+        semaphore = asyncio.Semaphore(GEMINI_CONCURRENCY)
+        
+        async def answer(query: str, search_results: list) -> str:
+            if not self._has_context(search_results):
+                return NO_CONTEXT_RESPONSE
+            cache_key = self._response_cache_key(query, search_results)
+            cached_response = self._get_cached_response(cache_key)
+            if cached_response is not None:
+                return cached_response
+            
+            try:
+                async with semaphore:
+                    response = await self.model.generate_content_async(
+                        [
+                            {"role": "user", "parts": [self._build_prompt(query, search_results)]}
+                        ],
+                        generation_config=ANSWER_GENERATION_CONFIG,
+                        request_options=self.request_options
+                    )
+                answer_text = self._render_answer(response.text)
+                self._cache_response(cache_key, answer_text)
+                return answer_text
+            except Exception as e:
+                logger.error("Error generating Gemini response: %s", e)
+                return ERROR_RESPONSE
+        
+        return await asyncio.gather(*(answer(query, search_results) for query, search_results in pairs))
+    
+    def _submit_batch_job(self, prompts: Dict[str, str]) -> str:
+        """
+        Submit keyed prompts as one JSONL batch job.
+        
+        Args:
+            prompts: Prompt text by request key
+            
+        Returns:
+            str: Name of the submitted batch job
+        """
+        client = genai_sdk.Client(api_key=self.GEMINI_API_KEY)
+        
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", dir=TEMP_DIR, delete=False) as batch_file:
+            for key, prompt in prompts.items():
+                batch_file.write(json.dumps({
+                    "key": key,
+                    "request": {
+                        "system_instruction": {"parts": [{"text": SYSTEM_PROMPT}]},
+                        "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                        "generation_config": ANSWER_GENERATION_CONFIG
+                    }
+                }) + "\n")
+        
+        try:
+            uploaded = client.files.upload(file=batch_file.name, config={"mime_type": "jsonl"})
+        finally:
+            os.unlink(batch_file.name)
+        
+        job = client.batches.create(model=self.model_name, src=uploaded.name)
+        logger.info("Submitted Gemini batch job %s with %d requests", job.name, len(prompts))
+        return job.name
+    
+    def _download_batch_results(self, client: Any, job: Any) -> Dict[str, str]:
+        """
+        Download a succeeded batch job's output file.
+        
+        Returns:
+            Dict[str, str]: Rendered response text by request key, for the requests that succeeded
+        """
+        results = {}
+        for line in client.files.download(file=job.dest.file_name).decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            candidates = item.get("response", {}).get("candidates")
+            if candidates:
+                results[item["key"]] = self._render_answer("".join(
+                    part.get("text", "") for part in candidates[0]["content"]["parts"]
+                ))
+        
+        return results
+    
+    def _live_pinned_model(self, result_ids: set) -> Optional[Any]:
+        """The pinned-context model if it covers every result id and has not expired, else None"""
+        with self._pin_lock:
+            if self._pinned_model is None or not result_ids <= self._pinned_ids:
+                return None
+            if self._pinned_expires_at <= time.monotonic():
+                return None
+            return self._pinned_model
+    
+    def _drop_pinned_context(self, pinned_model: Any) -> None:
+        """Stop using pinned_model (if still current) after a failed call"""
+        with self._pin_lock:
+            if self._pinned_model is pinned_model:
+                self._pinned_model = None
+                self._pinned_ids = frozenset()
+    
+    def _track_results(self, search_results: List[Dict[str, Any]]) -> None:
+        """Count how often each result is answered from and periodically re-pin the hottest ones"""
+        with self._pin_lock:
+            for result in search_results:
+                result_id = result.get("id")
+                if result_id and result.get("text"):
+                    self._result_hits[str(result_id)] += 1
+                    self._seen_results[str(result_id)] = result
+            
+            self._queries_since_pin += 1
+            expired = self._pinned_model is not None and self._pinned_expires_at <= time.monotonic()
+            if self._pin_refreshing or (self._queries_since_pin < CONTEXT_CACHE_REFRESH_QUERIES and not expired):
+                return
+            
+            hot_results = {}
+            for result_id, _ in self._result_hits.most_common():
+                if result_id in self._seen_results:
+                    hot_results[result_id] = self._seen_results[result_id]
+                    if len(hot_results) == CONTEXT_CACHE_MAX_RESULTS:
+                        break
+            if not hot_results:
+                return
+            
+            # Only the ids being pinned need to be remembered until the next refresh
+            self._seen_results = dict(hot_results)
+            self._queries_since_pin = 0
+            self._pin_refreshing = True
+        
+        _PIN_EXECUTOR.submit(self._refresh_pinned_context, hot_results)
+    
+    def _refresh_pinned_context(self, hot_results: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Upload the most frequently used results as Gemini cached content, so later queries
+        over them send a short reference instead of the full result text.
+        
+        Args:
+            hot_results: Results to pin by id, hottest first
+        """
+        try:
+            blocks = []
+            for result_id, result in hot_results.items():
+                blocks.append(
+                    f'<doc id="{result_id}" name="{result.get("startup_name") or result.get("report_title") or "Unknown"}" '
+                    f'industry="{result.get("industry", "Unknown")}">{result["text"]}</doc>'
+                )
+            
+            try:
+                pinned_cache = caching.CachedContent.create(
+                    model=self.model_name,
+                    display_name="investor-intel-hot-results",
+                    system_instruction=SYSTEM_PROMPT,
+                    contents=["".join(blocks)],
+                    ttl=datetime.timedelta(seconds=CONTEXT_CACHE_TTL)
+                )
+                pinned_model = genai.GenerativeModel.from_cached_content(cached_content=pinned_cache)
+            except Exception as e:
+                # Typically the content is below the model's minimum cacheable size; keep inline context
+                logger.warning("Could not create Gemini context cache: %s", e)
+                return
+            
+            with self._pin_lock:
+                previous_cache = self._pinned_cache
+                self._pinned_cache = pinned_cache
+                self._pinned_model = pinned_model
+                self._pinned_ids = frozenset(hot_results)
+                self._pinned_expires_at = time.monotonic() + CONTEXT_CACHE_TTL - CONTEXT_CACHE_EXPIRY_MARGIN
+            
+            if previous_cache is not None:
+                try:
+                    previous_cache.delete()
+                except Exception as e:
+                    logger.warning("Could not delete previous Gemini context cache: %s", e)
+        finally:
+            with self._pin_lock:
+                self._pin_refreshing = False
+    
+    def _render_answer(self, response_text: str) -> str:
+        """
+        Render a structured {"bullets": [...]} answer as bullet lines.
+        
+        Args:
+            response_text: Raw response text from Gemini
+            
+        Returns:
+            str: One "• " line per bullet, or the cleaned raw text if it is not the expected JSON
+        """
+        try:
+            bullets = json.loads(response_text)["bullets"]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # A long answer cut off at max_output_tokens is truncated JSON; keep its complete bullets
+            bullets = self._complete_bullets(response_text)
+            if not bullets:
+                return self._clean_response_format(response_text)
+        try:
+            return "\n".join(f"• {bullet.strip()}" for bullet in bullets if bullet.strip())
+        except AttributeError:
+            return self._clean_response_format(response_text)
+    
+    def _complete_bullets(self, response_text: str) -> List[str]:
+        """
+        Recover the fully generated bullets of a truncated {"bullets": [...]} answer.
+        
+        Args:
+            response_text: Raw (possibly cut off) response text from Gemini
+            
+        Returns:
+            List[str]: Bullets whose closing quote was generated, or [] if the text is not a bullet list
+        """
+        start = BULLETS_START_PATTERN.search(response_text or "")
+        if not start:
+            return []
+        bullets = []
+        for match in JSON_STRING_PATTERN.finditer(response_text, start.end()):
+            try:
+                bullets.append(json.loads(f'"{match.group(1)}"'))
+            except ValueError:
+                break
+        return bullets
+    
+    def _has_context(self, search_results: List[Dict[str, Any]]) -> bool:
+        """
+        Check whether any search result is relevant enough and carries text worth sending to Gemini.
+        Stops at the first such result; results without a score count as relevant.
+        """
+        if not search_results:
+            return False
+        
+        # Results arrive best first, so a weak top result rules out the rest without scanning them
+        threshold = self.min_relevance_threshold
+        top_score = search_results[0].get("score")
+        if top_score is not None and top_score < threshold:
+            return False
+        
+        return any(
+            r.get("text") and (r.get("score") is None or r["score"] >= threshold)
+            for r in search_results
+        )
+    
+    def _get_cached_response(self, cache_key: bytes) -> Optional[str]:
+        """Return an unexpired cached answer for cache_key, or None"""
+        with self._response_cache_lock:
+            entry = self._response_cache.get(cache_key)
+            if entry is None:
+                return None
+            expires_at, text = entry
+            if expires_at < time.monotonic():
+                del self._response_cache[cache_key]
+                return None
+            self._response_cache.move_to_end(cache_key)
+            return text
+    
+    def _cache_response(self, cache_key: bytes, text: str) -> None:
+        """Store a generated answer, evicting the least recently used one when full"""
+        with self._response_cache_lock:
+            self._response_cache[cache_key] = (time.monotonic() + RESPONSE_CACHE_TTL, text)
+            self._response_cache.move_to_end(cache_key)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+    
+    def _build_prompt(self, query: str, search_results: List[Dict[str, Any]]) -> str:
+        """
+        Build the Gemini prompt from the query and its search results.
+        
+        Args:
+            query: The query string
+            search_results: List of search results from both startup data and report data
+            
+        Returns:
+            str: Prompt combining the question and the formatted results
+        """
+        # One compact <doc> element per result; the tags carry the metadata, so no separators are needed
+        docs = []
         for i, result in enumerate(search_results, 1):
-            # Extract key information from the result
-            startup_name = result.get("startup_name", "Unknown")
-            industry = result.get("industry", "Unknown Industry")
-            content = result.get("text", "No content available")
-            
-            # Check if content is empty or None and provide a placeholder
-            if not content or content.strip() == "":
-                content = "No content available for this startup."
-            
-            # Format the result without score or length information
-            formatted_result = f"""
-RESULT #{i}:
-Startup: {startup_name}
-Industry: {industry}
-
-{content}
----
-"""
-            formatted_results.append(formatted_result)
-        
-        # Combine all formatted results into a single string
-        context = "\n".join(formatted_results)
-        return context
+            source = result.get("source")
+            content = result.get("text", "No information available")
+            if source == "startup":
+                docs.append(
+                    f'<doc id="{i}" type="startup" name="{result.get("startup_name", "Unnamed Startup")}" '
+                    f'industry="{result.get("industry", "Unknown")}">{content}</doc>'
+                )
+            elif source == "deloitte-report":
+                docs.append(
+                    f'<doc id="{i}" type="industry report" title="{result.get("report_title", "Untitled Report")}" '
+                    f'industry="{result.get("industry", "Unknown")}" year="{result.get("year", "Unknown")}">{content}</doc>'
+                )
+        
+        # Instructions live in the model's system instruction, so the prompt is just query + context
+        return f"QUERY: {query}\nSEARCH RESULTS:\n{''.join(docs)}"
+    
+    def _response_cache_key(self, query: str, search_results: List[Dict[str, Any]]) -> bytes:
+        """
+        Build the response cache key from the query and the ids of the results it is answered from.
+        
+        Args:
+            query: The query string
+            search_results: Search results passed to Gemini
+            
+        Returns:
+            bytes: Digest identifying this (query, results) pair
+        """
+        result_ids = sorted(str(r.get("id", "")) for r in search_results)
+        normalized_query = query.lower().strip()
+        return hashlib.blake2b(
+            f"{normalized_query}|{'|'.join(result_ids)}".encode("utf-8"), digest_size=16
+        ).digest()
+    
+    def _normalize_bullets(self, text: str) -> str:
+        """
+        Normalize bullet formatting over the whole response in a few regex passes.
+        
+        Args:
+            text: Response text
+            
+        Returns:
+            str: Text with every line stripped, '*'/'-' bullets converted and
+            each bullet starting its own line
+        """
+        text = LINE_EDGE_WHITESPACE_PATTERN.sub('', text)
+        text = LEADING_BULLET_PATTERN.sub('• ', text)
+        return INLINE_BULLET_PATTERN.sub('\n• ', text)
+    
+    def _clean_stream_block(self, block: str, is_first: bool) -> str:
+        """
+        Apply the response cleanup to one streamed block of complete lines.
+        
+        Args:
+            block: Streamed text ending at a line break (or the final tail)
+            is_first: Whether this is the first block of the response
+            
+        Returns:
+            str: Cleaned block
+        """
+        if is_first:
+            block = _strip_intro(block.lstrip())
+        block = RESULT_REFERENCE_PATTERN.sub('', block)
+        block = self._normalize_bullets(block)
+        return EXTRA_NEWLINES_PATTERN.sub('\n\n', block)
     
     def _clean_response_format(self, text: str) -> str:
         """
@@ -176,72 +762,20 @@ Industry: {industry}
         # Remove any introductory phrases
         text = text.strip()
         
-        # List of common introductory phrases to remove
-        intros = [
-            "Based on the provided search results:",
-            "Based on the search results provided:",
-            "Here's the information from the search results:",
-            "According to the search results:",
-            "Here's what I found in the search results:",
-            "From the search results:",
-            ", here's the information about",
-            ", here's what is known about",
-            "The search results indicate that",
-            "The information available from the search results shows"
-        ]
-        
-        for intro in intros:
-            if text.lower().startswith(intro.lower()):
-                text = text[len(intro):].strip()
+        # Strip a leading introductory phrase by matching only the start of the text
+        text = _strip_intro(text)
         
         # Remove all result references
-        text = re.sub(r'\(Result #\d+\)', '', text)
-        text = re.sub(r'\(Source \d+\)', '', text)
+        text = RESULT_REFERENCE_PATTERN.sub('', text)
         
-        # Fix bullet point formatting line by line
-        lines = text.split('\n')
-        formatted_lines = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Skip empty lines
-            if not line:
-                formatted_lines.append('')
-                i += 1
-                continue
-                
-            # Fix bullet points at the start of lines
-            if line.startswith('*') or line.startswith('-'):
-                line = '• ' + line[1:].strip()
-                
-            # Check for multiple bullets on the same line
-            if '• ' in line and not line.startswith('• '):
-                # This line has bullets but doesn't start with one
-                parts = re.split(r'(• )', line)
-                new_parts = []
-                
-                for j, part in enumerate(parts):
-                    if part == '• ' and j > 0 and parts[j-1].strip() and j+1 < len(parts):
-                        # This is a bullet in the middle of text
-                        new_parts.append('\n• ')
-                    else:
-                        new_parts.append(part)
-                
-                line = ''.join(new_parts)
-                
-            # Add the processed line
-            formatted_lines.append(line)
-            i += 1
-        
-        # Join lines and clean up spacing
-        text = '\n'.join(formatted_lines)
-        
-        # Fix any remaining bullet point issues
-        text = text.replace('\n• ', '\n• ')  # Ensure consistent spacing
-        text = re.sub(r'([^\n])• ', r'\1\n• ', text)  # Add line break before bullets
-        text = re.sub(r'\n{3,}', '\n\n', text)  # No more than 2 consecutive line breaks
+        # Fix bullet point formatting without splitting the text into lines
+        text = self._normalize_bullets(text)
+        text = EXTRA_NEWLINES_PATTERN.sub('\n\n', text)  # No more than 2 consecutive line breaks
         
         return text.strip()
-    
\ No newline at end of file
+    
+
+@functools.lru_cache(maxsize=None)
+def get_gemini_assistant() -> GeminiAssistant:
+    """Build the process-wide GeminiAssistant on first use, so its caches are shared by every app module"""
+    return GeminiAssistant()
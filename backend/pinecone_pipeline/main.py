@@ -1,51 +1,60 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import os
-import tempfile
-import shutil
-import json
+import asyncio
+import orjson
 import sys
-import traceback
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; WARNING by default so per-request info/debug lines are not formatted or written
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
 logger = logging.getLogger(__name__)
 
+# Largest pitch deck accepted by /process-pitch-deck
+MAX_PITCH_DECK_BYTES = 50 * 1024 * 1024
+
+# Responses smaller than this (bytes) are sent uncompressed
+GZIP_MINIMUM_SIZE = 1024
+
+# Sentinel queries that simulate an empty database, matched with one set lookup
+TEST_EMPTY_QUERIES = frozenset({"test empty database", "test no results"})
+
 # Import functions from the existing summary.py file
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
 # Try different import paths to handle various directory structures
 try:
-    from summary import summarize_pitch_deck_with_gemini, validate_environment
+    from summary import summarize_pitch_deck_with_gemini_async, validate_environment
 except ImportError:
     try:
-        from pinecone_pipeline.summary import summarize_pitch_deck_with_gemini, validate_environment
+        from pinecone_pipeline.summary import summarize_pitch_deck_with_gemini_async, validate_environment
     except ImportError:
         logger.error("Error: Unable to import summary module")
         raise
 
 try:
-    from embedding_manager import EmbeddingManager
+    from embedding_manager import get_embedding_manager
 except ImportError:
     try:
-        from pinecone_pipeline.embedding_manager import EmbeddingManager
+        from pinecone_pipeline.embedding_manager import get_embedding_manager
     except ImportError:
         logger.error("Error: Unable to import EmbeddingManager")
-        EmbeddingManager = None
+        get_embedding_manager = None
 
 try:
-    from gemini_assistant import GeminiAssistant
+    from gemini_assistant import get_gemini_assistant
 except ImportError:
     try:
-        from pinecone_pipeline.gemini_assistant import GeminiAssistant
+        from pinecone_pipeline.gemini_assistant import get_gemini_assistant
     except ImportError:
         logger.error("Error: Unable to import GeminiAssistant")
-        GeminiAssistant = None
+        get_gemini_assistant = None
 
 try:
     from s3_utils import upload_pitch_deck_to_s3
@@ -57,6 +66,9 @@ except ImportError:
         def upload_pitch_deck_to_s3(*args, **kwargs):
             raise NotImplementedError("S3 upload functionality not available")
 
+# summary.py reads its settings once at import, so the environment check cannot change afterwards
+ENV_VALID, MISSING_VARS = validate_environment()
+
 # Define request models for better validation
 class ChatRequest(BaseModel):
     query: str
@@ -69,23 +81,24 @@ embedding_manager = None
 gemini_assistant = None
 
 try:
-    embedding_manager = EmbeddingManager()
+    embedding_manager = get_embedding_manager()
     logger.info("Successfully initialized EmbeddingManager")
 except Exception as e:
-    logger.warning(f"Failed to initialize embedding manager. Pinecone functionality will be disabled: {e}")
-    logger.debug(traceback.format_exc())
+    logger.warning("Failed to initialize embedding manager. Pinecone functionality will be disabled: %s", e)
+    logger.debug("Traceback", exc_info=True)
 
 try: 
-    gemini_assistant = GeminiAssistant()
+    gemini_assistant = get_gemini_assistant()
     logger.info("Successfully initialized GeminiAssistant")
 except Exception as e:
-    logger.warning(f"Failed to initialize Gemini assistant. AI analysis will be disabled: {e}")
-    logger.debug(traceback.format_exc())
+    logger.warning("Failed to initialize Gemini assistant. AI analysis will be disabled: %s", e)
+    logger.debug("Traceback", exc_info=True)
 
 app = FastAPI(
     title="InvestorIntel API",
     description="API for processing startup pitch decks and generating investor summaries",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware to allow requests from the Streamlit frontend
@@ -97,6 +110,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies (search results, summaries) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the InvestorIntel API"}
@@ -105,7 +121,7 @@ async def root():
 async def health_check():
     """Check if the API is running and all required environment variables are set."""
     
-    is_valid, missing_vars = validate_environment()
+    is_valid, missing_vars = ENV_VALID, MISSING_VARS
     
     embedding_status = "active" if embedding_manager else "disabled"
     gemini_status = "active" if gemini_assistant else "disabled"
@@ -136,15 +152,15 @@ async def check_startup_exists(request: StartupExistsRequest):
         )
     
     try:
-        exists = embedding_manager.check_startup_exists(request.startup_name)
+        exists = await asyncio.to_thread(embedding_manager.check_startup_exists, request.startup_name)
         
         return {
             "exists": exists,
             "startup_name": request.startup_name
         }
     except Exception as e:
-        logger.error(f"Error checking if startup exists: {e}")
-        logger.debug(traceback.format_exc())
+        logger.error("Error checking if startup exists: %s", e)
+        logger.debug("Traceback", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error checking if startup exists: {str(e)}"
@@ -161,13 +177,15 @@ async def process_pitch_deck(
     """Process a pitch deck PDF and generate an investor summary."""
     
     # Parse the LinkedIn URLs from JSON string if provided
-    linkedin_urls_list = []
-    if linkedin_urls:
+    # Only a value that looks like JSON is parsed; a plain URL skips the guaranteed decode error
+    linkedin_urls = (linkedin_urls or "").strip()
+    linkedin_urls_list = [linkedin_urls] if linkedin_urls else []
+    if linkedin_urls.startswith(("[", "{")):
         try:
-            linkedin_urls_list = json.loads(linkedin_urls)
-        except json.JSONDecodeError:
+            linkedin_urls_list = orjson.loads(linkedin_urls)
+        except orjson.JSONDecodeError:
             # If not valid JSON, treat it as a single URL
-            linkedin_urls_list = [linkedin_urls]
+            pass
     
     # Get the original filename
     original_filename = file.filename
@@ -177,7 +195,7 @@ async def process_pitch_deck(
     industry = industry or "Unknown"
     
     # Check if required environment variables are set
-    is_valid, missing_vars = validate_environment()
+    is_valid, missing_vars = ENV_VALID, MISSING_VARS
     if not is_valid:
         raise HTTPException(
             status_code=500, 
@@ -185,105 +203,98 @@ async def process_pitch_deck(
         )
     
     # First check if the startup already exists in Pinecone (case-insensitive)
-    if embedding_manager and embedding_manager.check_startup_exists(startup_name):
+    if embedding_manager and await asyncio.to_thread(embedding_manager.check_startup_exists, startup_name):
         return {
             "error": "startup_exists",
             "message": f"A startup with the name '{startup_name}' already exists in the database.",
             "startup_name": startup_name
         }
     
-    # Create a temporary directory to store the uploaded file
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create a temporary filename for local storage
-        temp_filename = f"temp_pitch_deck.pdf"
-        file_path = os.path.join(temp_dir, temp_filename)
-        
-        # Save the uploaded file to the temporary directory
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-        except Exception as e:
-            logger.error(f"Failed to save file: {e}")
-            logger.debug(traceback.format_exc())
-            raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
-        
-        # Upload the file to S3
-        try:
-            s3_location = upload_pitch_deck_to_s3(
-                file_path=file_path,
-                startup_name=startup_name,
-                industry=industry,
-                original_filename=original_filename
-            )
-            
-            if not s3_location:
-                raise HTTPException(status_code=500, detail="Failed to upload file to S3")
-                
-            logger.info(f"File uploaded successfully to S3: {s3_location}")
-        except Exception as e:
-            logger.error(f"S3 upload error: {e}")
-            logger.debug(traceback.format_exc())
-            raise HTTPException(status_code=500, detail=f"S3 upload error: {str(e)}")
-        
-        # Generate summary using Gemini
+    # Read the upload once into memory; S3 and Gemini both take the bytes directly
+    if file.size is not None and file.size > MAX_PITCH_DECK_BYTES:
+        raise HTTPException(status_code=413, detail="Pitch deck exceeds the 50 MB upload limit")
+    try:
+        pdf_bytes = await file.read()
+    except Exception as e:
+        logger.error("Failed to read file: %s", e)
+        logger.debug("Traceback", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to read file: {str(e)}")
+    if len(pdf_bytes) > MAX_PITCH_DECK_BYTES:
+        raise HTTPException(status_code=413, detail="Pitch deck exceeds the 50 MB upload limit")
+    
+    # Upload to S3 and summarize with Gemini concurrently; neither needs the other's result
+    upload_task = asyncio.to_thread(
+        upload_pitch_deck_to_s3,
+        startup_name=startup_name,
+        industry=industry,
+        original_filename=original_filename,
+        file_bytes=pdf_bytes
+    )
+    summary_task = summarize_pitch_deck_with_gemini_async(
+        file_path=None,
+        api_key=os.getenv("GEMINI_API_KEY"),
+        model_name="gemini-2.0-flash",
+        pdf_bytes=pdf_bytes,
+        display_name=original_filename
+    )
+    s3_location, investor_summary = await asyncio.gather(upload_task, summary_task, return_exceptions=True)
+    
+    if isinstance(s3_location, Exception):
+        logger.error("S3 upload error: %s", s3_location)
+        logger.debug("Traceback", exc_info=s3_location)
+        raise HTTPException(status_code=500, detail=f"S3 upload error: {str(s3_location)}")
+    if not s3_location:
+        raise HTTPException(status_code=500, detail="Failed to upload file to S3")
+    logger.info("File uploaded successfully to S3: %s", s3_location)
+    
+    if isinstance(investor_summary, Exception):
+        logger.error("Summary generation error: %s", investor_summary)
+        logger.debug("Traceback", exc_info=investor_summary)
+        raise HTTPException(status_code=500, detail=f"Summary generation error: {str(investor_summary)}")
+    if not investor_summary:
+        raise HTTPException(status_code=500, detail="Failed to generate summary")
+    
+    # Store embedding and summary
+    embedding_status = "skipped"
+    snowflake_status = "skipped"
+    
+    if embedding_manager:
         try:
-            investor_summary = summarize_pitch_deck_with_gemini(
-                file_path=file_path,
-                api_key=os.getenv("GEMINI_API_KEY"),
-                model_name="gemini-2.0-flash"
-            )
+            # The stored metadata already carries the Snowflake outcome; no follow-up query needed
+            stored_metadata = (await asyncio.to_thread(
+                embedding_manager.store_summary_embeddings_bulk,
+                [{
+                    "summary": investor_summary,
+                    "startup_name": startup_name,
+                    "industry": industry,
+                    "website_url": website_url,
+                    "linkedin_urls": linkedin_urls_list,
+                    "original_filename": original_filename,
+                    "s3_location": s3_location
+                }],
+                return_metadata=True
+            ))[0]
+            embedding_status = "success" if stored_metadata else "failed"
+            if stored_metadata:
+                snowflake_status = stored_metadata.get("snowflake_status", "skipped")
             
-            if not investor_summary:
-                raise HTTPException(status_code=500, detail="Failed to generate summary")
-
         except Exception as e:
-            logger.error(f"Summary generation error: {e}")
-            logger.debug(traceback.format_exc())
-            raise HTTPException(status_code=500, detail=f"Summary generation error: {str(e)}")
-        
-        # Store embedding and summary
-        embedding_status = "skipped"
-        snowflake_status = "skipped"
-        
-        if embedding_manager:
-            try:
-                embedding_success = embedding_manager.store_summary_embeddings(
-                    summary=investor_summary,
-                    startup_name=startup_name,
-                    industry=industry,
-                    website_url=website_url,
-                    linkedin_urls=linkedin_urls_list,
-                    original_filename=original_filename,
-                    s3_location=s3_location
-                )
-                embedding_status = "success" if embedding_success else "failed"
-                
-                # Check if metadata has snowflake_status
-                if embedding_success:
-                    results = embedding_manager.search_similar_startups(
-                        query="",
-                        top_k=1
-                    )
-                    if results and len(results) > 0:
-                        snowflake_status = results[0].get("snowflake_status", "skipped")
-                
-            except Exception as e:
-                logger.error(f"Error storing embedding: {e}")
-                logger.debug(traceback.format_exc())
-                embedding_status = "error"
-                snowflake_status = "error"
-        
-        # Return the results
-        return {
-            "startup_name": startup_name,
-            "industry": industry,
-            "linkedin_urls": linkedin_urls_list,
-            "s3_location": s3_location,
-            "original_filename": original_filename,
-            "summary": investor_summary,
-            "embedding_status": embedding_status,
-            "snowflake_status": snowflake_status
-        }
+            logger.error("Error storing embedding: %s", e)
+            logger.debug("Traceback", exc_info=True)
+            embedding_status = "error"
+            snowflake_status = "error"
+    
+    # Return the results
+    return {
+        "startup_name": startup_name,
+        "industry": industry,
+        "linkedin_urls": linkedin_urls_list,
+        "s3_location": s3_location,
+        "original_filename": original_filename,
+        "summary": investor_summary,
+        "embedding_status": embedding_status,
+        "snowflake_status": snowflake_status
+    }
 
 @app.post("/chat")
 async def chat(request: ChatRequest):
@@ -311,7 +322,7 @@ async def chat(request: ChatRequest):
         }
     
     # Handle test cases for empty database or other edge cases
-    if query.lower() in ["test empty database", "test no results"]:
+    if query.lower() in TEST_EMPTY_QUERIES:
         logger.info("Test case: empty database or no results")
         return {
             "response": "I don't have any information about that in my database. Please try asking about a different startup or topic.",
@@ -321,14 +332,16 @@ async def chat(request: ChatRequest):
     
     try:
         # Search for relevant startups
-        results = embedding_manager.search_similar_startups(
+        results = await asyncio.to_thread(
+            embedding_manager.search_similar_startups,
             query=query,
-            top_k=5  # Get the top 5 most relevant results
+            top_k=5,  # Get the top 5 most relevant results
+            min_score=gemini_assistant.min_relevance_threshold
         )
         
         # Check if we have any results
         if not results or len(results) == 0:
-            logger.info(f"No results found for query: '{query}'")
+            logger.info("No results found for query: '%s'", query)
             return {
                 "response": "I don't have any information about that in my database. Please try asking about a different startup or topic.",
                 "query": query,
@@ -336,18 +349,20 @@ async def chat(request: ChatRequest):
             }
         
         # Process with Gemini
-        ai_response = gemini_assistant.process_query_with_results(
+        ai_response = await asyncio.to_thread(
+            gemini_assistant.process_query_with_results,
             query=query,
             search_results=results
         )
         
-        # Check for "I don't have information" response
-        if "don't have" in ai_response.lower() and "information" in ai_response.lower() and "database" in ai_response.lower():
+        # Check for "I don't have information" response, lowercasing the text only once
+        response_lower = ai_response.lower()
+        if "don't have" in response_lower and "information" in response_lower and "database" in response_lower:
             # This is a no-information response
-            logger.info(f"No relevant information found for query: '{query}'")
+            logger.info("No relevant information found for query: '%s'", query)
         else:
             # This is a response with content
-            logger.info(f"Generated response for query: '{query}' with {len(results)} results")
+            logger.info("Generated response for query: '%s' with %d results", query, len(results))
         
         return {
             "response": ai_response,
@@ -355,8 +370,8 @@ async def chat(request: ChatRequest):
             "results_count": len(results)
         }
     except Exception as e:
-        logger.error(f"Error processing chat query: {e}")
-        logger.debug(traceback.format_exc())
+        logger.error("Error processing chat query: %s", e)
+        logger.debug("Traceback", exc_info=True)
         
         # Return a user-friendly error message
         return {
@@ -366,6 +381,48 @@ async def chat(request: ChatRequest):
             "error": str(e)
         }
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Stream a chat answer as NDJSON: the search results first, then the AI answer in chunks
+    as Gemini produces them, so clients can render results before generation finishes.
+    """
+    if not embedding_manager or not gemini_assistant:
+        raise HTTPException(status_code=503, detail="Search or Gemini assistant is not available.")
+    
+    query = request.query.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Please enter a question about startups in our database.")
+    
+    try:
+        results = await asyncio.to_thread(
+            embedding_manager.search_similar_startups,
+            query=query,
+            top_k=5,
+            min_score=gemini_assistant.min_relevance_threshold
+        )
+    except Exception as e:
+        logger.error("Chat stream search error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    results = results or []
+    
+    async def ndjson_lines():
+        yield orjson.dumps({"query": query, "results_count": len(results), "results": results}) + b"\n"
+        async for chunk in gemini_assistant.process_query_with_results_stream(query=query, search_results=results):
+            yield orjson.dumps({"response": chunk}) + b"\n"
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Workers need an import string; each one imports this module and builds its own managers
+    uvicorn.run(
+        f"{Path(__file__).stem}:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host="0.0.0.0",
+        port=8000,
+        # Default to 2 like the Dockerfile: every worker loads its own embedding model
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        loop="uvloop",
+        http="httptools"
+    )
\ No newline at end of file
@@ -1,5 +1,8 @@
 import asyncio, json
 import shutil, os
+import time
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 from agents import Agent, Runner, trace
 from agents.mcp import MCPServerStdio
@@ -13,32 +16,205 @@ GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 GOOGLE_SEARCH_ENGINE_ID = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-async def google_search_with_fallback(startup_name: str, industry_name: str):
-    print("Initializing MCP Google Search Agent")
-    async with MCPServerStdio(
-        cache_tools_list=True,
-        params={
-            "command": "npx",
-            "args": ["-y", "@adenot/mcp-google-search"],
-            "env": {
-                "GOOGLE_SEARCH_ENGINE_ID": f"{GOOGLE_SEARCH_ENGINE_ID}",
-                "GOOGLE_API_KEY": f"{GOOGLE_API_KEY}"
-            }
-        },
-    ) as server:
-        print("MCPServerStdio initialized")
+# Results requested per search query
+SEARCH_RESULT_COUNT = 5
+
+# Search results kept per (query, result count), and for how long (seconds); news goes stale slowly
+SEARCH_CACHE_SIZE = 1024
+SEARCH_CACHE_TTL = int(os.getenv("MCP_SEARCH_CACHE_TTL", "3600"))
+
+# Issue the industry fallback search alongside the startup search instead of after it
+# (set to "false" to save search quota when most startups are found)
+SPECULATIVE_FALLBACK = os.getenv("SEARCH_SPECULATIVE_FALLBACK", "true").lower() == "true"
+
+# Longest wait (seconds) for a single search before treating it as empty
+SEARCH_TIMEOUT = float(os.getenv("MCP_SEARCH_TIMEOUT", "30"))
+
+class MCPGoogleSearchClient:
+    """Keeps one MCP Google Search server (a Node subprocess) connected for all searches"""
+
+    def __init__(self):
+        self._server = None
+        self._agent = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> Agent:
+        """Start the MCP server on first use and return the agent bound to it"""
+        if self._agent is not None:
+            return self._agent
+        # Concurrent first calls wait here so only one subprocess is spawned
+        async with self._lock:
+            if self._agent is None:
+                print("Initializing MCP Google Search Agent")
+                server = MCPServerStdio(
+                    cache_tools_list=True,
+                    params={
+                        "command": "npx",
+                        "args": ["-y", "@adenot/mcp-google-search"],
+                        "env": {
+                            "GOOGLE_SEARCH_ENGINE_ID": f"{GOOGLE_SEARCH_ENGINE_ID}",
+                            "GOOGLE_API_KEY": f"{GOOGLE_API_KEY}"
+                        }
+                    },
+                )
+                try:
+                    await server.connect()
+                except Exception:
+                    # Don't leave a half-started subprocess behind
+                    await server.cleanup()
+                    raise
+                print("MCPServerStdio initialized")
+                self._server = server
+                self._agent = Agent(
+                    name="Google Search Agent",
+                    instructions=(
+                        "You are a Google Search Agent. You will receive a query and return the results "
+                        "as a JSON array of objects with title, url and snippet fields."
+                    ),
+                    mcp_servers=[server],
+                    model="gpt-4o-mini"
+                )
+        return self._agent
+
+    async def close(self):
+        """Stop the MCP server subprocess; the next search starts a new one"""
+        async with self._lock:
+            await self._close_server()
+
+    async def reset(self, failed_agent: Agent):
+        """Drop the connection a failed search used (e.g. the subprocess died) so the next search reconnects"""
+        async with self._lock:
+            # A concurrent failure may already have reconnected; keep the new session
+            if self._agent is failed_agent:
+                print("MCP search failed, restarting the MCP server on next use")
+                await self._close_server()
+
+    async def _close_server(self):
+        """Clean up the current server; the caller holds _lock"""
+        server, self._server, self._agent = self._server, None, None
+        if server is not None:
+            try:
+                await server.cleanup()
+            except Exception as e:
+                print(f"Error closing MCP server: {e}")
+
+# Shared by every search in the process; close it on app shutdown
+search_client = MCPGoogleSearchClient()
+
+def _parse_results(output) -> list:
+    """Turn the agent's JSON answer into a list of result dicts"""
+    if isinstance(output, str):
+        output = output.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+        try:
+            output = json.loads(output)
+        except json.JSONDecodeError:
+            return []
+    if isinstance(output, dict):
+        output = output.get("results") or output.get("items") or []
+    return [item for item in output if isinstance(item, dict)] if isinstance(output, list) else []
+
+_search_cache = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+def _get_cached_search(cache_key: tuple):
+    """Return a copy of unexpired cached results for cache_key, or None"""
+    with _search_cache_lock:
+        entry = _search_cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, items = entry
+        if expires_at < time.monotonic():
+            del _search_cache[cache_key]
+            return None
+        _search_cache.move_to_end(cache_key)
+        return list(items)
+
+def _cache_search(cache_key: tuple, items: list) -> None:
+    """Store results, evicting the least recently used entry when full"""
+    with _search_cache_lock:
+        _search_cache[cache_key] = (time.monotonic() + SEARCH_CACHE_TTL, list(items))
+        _search_cache.move_to_end(cache_key)
+        if len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+async def mcp_search(query: str, num_results: int = SEARCH_RESULT_COUNT) -> list:
+    """Run one Google search through the shared MCP agent, reusing recent results for the same query"""
+    cache_key = (query.strip().lower(), num_results)
+    cached = _get_cached_search(cache_key)
+    if cached is not None:
+        return cached
+    
+    searchagent = await search_client.connect()
+    try:
         with trace(workflow_name="MCP Google Search"):
-            print(await server.list_tools())
-            searchagent: Agent = Agent(
-                name="Google Search Agent",
-                instructions="You are a Google Search Agent. You will receive a query and return the results in JSON format.",
-                mcp_servers=[server],
-                model="gpt-4o-mini"
-            )
-            query = f"recent news or innovations or articles of {startup_name} or {industry_name}"
-            results = await Runner.run(searchagent, query)
-            print("Results:", results.final_output)
-            return {"results": results.final_output}
+            results = await Runner.run(searchagent, f"{query} (top {num_results} results)")
+    except Exception:
+        await search_client.reset(searchagent)
+        raise
+    print("Results:", results.final_output)
+    items = _parse_results(results.final_output)
+    # Empty results are usually a failed or unparsable answer, so they are retried next time
+    if items:
+        _cache_search(cache_key, items)
+    return items
+
+def _relevance_texts(items: list) -> tuple:
+    """Lowercased title and snippet of each result, built once per result set"""
+    # A newline between the fields keeps a name from matching across them
+    return tuple(f"{item.get('title', '')}\n{item.get('snippet', '')}".lower() for item in items)
+
+def _mentions_startup(texts: tuple, startup_name: str) -> bool:
+    """Whether any result text (from _relevance_texts) mentions the startup by name"""
+    name = startup_name.lower()
+    return any(name in text for text in texts)
+
+async def _bounded_search(query: str) -> list:
+    """mcp_search limited to SEARCH_TIMEOUT; a timeout or failure counts as no results"""
+    try:
+        return await asyncio.wait_for(mcp_search(query), SEARCH_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"Search timed out after {SEARCH_TIMEOUT}s: {query}")
+    except Exception as e:
+        print(f"Search failed: {query}: {e}")
+    return []
+
+async def google_search_with_fallback(startup_name: str, industry_name: str):
+    """
+    Search news about the startup, falling back to industry news when nothing mentions it.
+    
+    Returns:
+        Tuple of ({"results": [...]}, search_type) where search_type is "startup" or "industry"
+    """
+    startup_query = f"recent news or innovations or articles about {startup_name}"
+    industry_query = f"recent news or innovations or articles in the {industry_name} industry"
+    
+    if SPECULATIVE_FALLBACK:
+        # Both searches start at once, so a miss costs max(startup, industry) instead of their sum,
+        # and a hit returns as soon as the startup search does
+        industry_task = asyncio.create_task(_bounded_search(industry_query))
+        try:
+            items = await _bounded_search(startup_query)
+            if _mentions_startup(_relevance_texts(items), startup_name):
+                return {"results": items}, "startup"
+            return {"results": await industry_task}, "industry"
+        finally:
+            # No-op once the industry search has finished
+            industry_task.cancel()
+    
+    items = await _bounded_search(startup_query)
+    if _mentions_startup(_relevance_texts(items), startup_name):
+        return {"results": items}, "startup"
+    return {"results": await _bounded_search(industry_query)}, "industry"
+
+async def close_search_client():
+    """Shut down the shared MCP server (FastAPI shutdown hook)"""
+    await search_client.close()
+
+async def _main():
+    try:
+        return await google_search_with_fallback("Elon Musk", "AI")
+    finally:
+        await close_search_client()
 
 if __name__ == "__main__":
-    print(asyncio.run(google_search_with_fallback("Elon Musk", "AI")))
+    print(asyncio.run(_main()))
@@ -1,11 +1,20 @@
 import os
 import uuid
+import queue
+from contextlib import contextmanager
+from typing import Dict, List
 from snowflake.connector import connect
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Idle Snowflake connections kept open for reuse (each new login takes about a second)
+SNOWFLAKE_POOL_SIZE = int(os.getenv("SNOWFLAKE_POOL_SIZE", "8"))
+
+# Summaries written per multi-row UPDATE statement
+SUMMARY_UPDATE_BATCH_SIZE = 1000
+
 class SnowflakeManager:
     """Class to manage Snowflake operations for startup summaries"""
     
@@ -21,6 +30,9 @@ class SnowflakeManager:
         # Validate credentials
         if not all([self.account, self.user, self.password, self.warehouse, self.database]):
             raise ValueError("Missing required Snowflake credentials")
+        
+        # Connections are opened on first use and returned here afterwards
+        self._pool = queue.Queue(maxsize=SNOWFLAKE_POOL_SIZE)
             
         # Initialize Snowflake objects
         # self.initialize_snowflake_objects()
@@ -33,9 +45,28 @@ class SnowflakeManager:
             password=self.password,
             role=self.role,
             warehouse=self.warehouse,
-            database=self.database
+            database=self.database,
+            client_session_keep_alive=True
         )
         
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection, opening a new one when none is idle"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self.get_connection()
+        try:
+            yield conn
+        except Exception:
+            # The connection may be left in a bad state; drop it rather than reuse it
+            conn.close()
+            raise
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+        
     # def initialize_snowflake_objects(self):
     #     """Initialize Snowflake database, schema, and table"""
     #     conn = self.get_connection()
@@ -90,34 +121,94 @@ class SnowflakeManager:
             original_filename: Original filename of the PDF
             
         Returns:
-            startup_id: Generated UUID for the startup
+            Name of the startup, or None when no STARTUP row matched (nothing was written)
+        """
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                # Insert the summary into Snowflake
+                cur.execute("""
+                UPDATE INVESTOR_INTEL_DB.STARTUP_INFORMATION.STARTUP
+        SET 
+            SUMMARY_REPORT = %s,
+            PITCH_DECK_LINK = %s,
+            PITCH_DECK_FILENAME = %s
+            WHERE 
+                STARTUP_NAME = %s
+        """, (
+                    summary,
+                    s3_location,
+                    original_filename,
+                    startup_name
+            ))
+                
+                updated = cur.rowcount
+                conn.commit()
+                return startup_name if updated else None
+            
+    def store_startup_summaries(self, rows: List[Dict]) -> List[str]:
         """
-        conn = self.get_connection()
-        cur = conn.cursor()
+        Store several startup summaries with one UPDATE statement per batch and a single commit
         
-        try:
-            # Generate a unique ID for the startup
-            # Insert the summary into Snowflake
-            cur.execute("""
-            UPDATE INVESTOR_INTEL_DB.STARTUP_INFORMATION.STARTUP
-    SET 
-        SUMMARY_REPORT = %s,
-        PITCH_DECK_LINK = %s,
-        PITCH_DECK_FILENAME = %s
-        WHERE 
-            STARTUP_NAME = %s
-    """, (
-                summary,
-                s3_location,
-                original_filename,
-                startup_name
-        ))
+        Args:
+            rows: Dicts with the keyword arguments of store_startup_summary
             
-            conn.commit()
-            return startup_name
+        Returns:
+            Names of the startups written (those with a STARTUP row), in the order of rows
+        """
+        if not rows:
+            return []
+        
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                written = set()
+                for start in range(0, len(rows), SUMMARY_UPDATE_BATCH_SIZE):
+                    batch = rows[start:start + SUMMARY_UPDATE_BATCH_SIZE]
+                    values = ", ".join(["(%s, %s, %s, %s)"] * len(batch))
+                    params = []
+                    for row in batch:
+                        params.extend((row["startup_name"], row["summary"], row.get("s3_location"), row.get("original_filename")))
+                    cur.execute(f"""
+                    UPDATE INVESTOR_INTEL_DB.STARTUP_INFORMATION.STARTUP AS s
+                    SET 
+                        SUMMARY_REPORT = v.summary,
+                        PITCH_DECK_LINK = v.pitch_deck_link,
+                        PITCH_DECK_FILENAME = v.pitch_deck_filename
+                    FROM (VALUES {values}) AS v(startup_name, summary, pitch_deck_link, pitch_deck_filename)
+                    WHERE s.STARTUP_NAME = v.startup_name
+                    """, tuple(params))
+                    # The UPDATE only reports a total count, so look up which names have a row
+                    names = [row["startup_name"] for row in batch]
+                    placeholders = ", ".join(["%s"] * len(names))
+                    cur.execute(f"""
+                    SELECT STARTUP_NAME
+                    FROM INVESTOR_INTEL_DB.STARTUP_INFORMATION.STARTUP
+                    WHERE STARTUP_NAME IN ({placeholders})
+                    """, tuple(names))
+                    written.update(name for (name,) in cur.fetchall())
+                
+                conn.commit()
+                return [row["startup_name"] for row in rows if row["startup_name"] in written]
+            
+    def get_startup_summaries(self, startup_names: List[str]) -> Dict[str, str]:
+        """
+        Fetch summaries for several startups in one query
+        
+        Args:
+            startup_names: Names of the startups to look up
             
-        except Exception as e:
-            raise e
-        finally:
-            cur.close()
-            conn.close() 
\ No newline at end of file
+        Returns:
+            Mapping of startup name to its stored summary
+        """
+        if not startup_names:
+            return {}
+        
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                placeholders = ", ".join(["%s"] * len(startup_names))
+                cur.execute(f"""
+                SELECT STARTUP_NAME, SUMMARY_REPORT
+                FROM INVESTOR_INTEL_DB.STARTUP_INFORMATION.STARTUP
+                WHERE STARTUP_NAME IN ({placeholders})
+                """, tuple(startup_names))
+                
+                return {name: summary for name, summary in cur.fetchall() if summary}
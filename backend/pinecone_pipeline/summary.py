@@ -1,8 +1,10 @@
-import boto3
+import asyncio
 import google.generativeai as genai
+import io
 import os
 import time
 import datetime
+import functools
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -18,6 +20,30 @@ AWS_REGION = os.getenv('AWS_REGION')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
 
+# Seconds between checks while Gemini processes an uploaded PDF
+FILE_POLL_SECONDS = 5
+
+# Detailed prompt for investor-focused summarization
+PITCH_DECK_PROMPT = """
+        Analyze the provided startup pitch deck PDF from the perspective of a venture capital investor.
+        Generate a concise summary covering the key aspects an investor needs to evaluate the opportunity.
+        Structure the summary clearly, addressing the following points based *only* on the document's content:
+
+        1.  **Problem:** Clearly state the core problem the startup addresses.
+        2.  **Solution:** Describe the startup's proposed solution.
+        3.  **Product/Service:** Briefly detail the offering.
+        4.  **Business Model:** Explain how the company intends to generate revenue.
+        5.  **Target Market & Opportunity:** Identify the customer segment and the market's size/potential.
+        6.  **Team:** Summarize key team members and their relevant background (if mentioned).
+        7.  **Traction/Milestones:** Highlight any achievements like user growth, revenue, partnerships, or completed milestones.
+        8.  **Competition:** List key competitors and the startup's differentiation (if provided).
+        9.  **Financials:** Summarize key financial data or projections presented.
+        10. **Funding Ask & Use:** State the amount of funding sought and its intended use.
+        11. **Investor Synopsis:** Conclude with a brief assessment of potential strengths, weaknesses, and overall investment appeal based *strictly* on the deck's content.
+
+        Be objective and extract information accurately. If information for a section is not present in the PDF, state that clearly (e.g., "Financial projections were not provided.").
+        """
+
 
 # --- Functions ---
 def validate_environment():
@@ -36,87 +62,126 @@ def validate_environment():
     missing_vars = [name for name, value in required_vars.items() if value is None]
     return len(missing_vars) == 0, missing_vars
 
-def summarize_pitch_deck_with_gemini(file_path, api_key, model_name):
+@functools.lru_cache(maxsize=None)
+def configure_gemini(api_key):
+    """
+    Configures the Gemini client once per API key; reconfiguring drops its open connections.
+    """
+    genai.configure(api_key=api_key)
+
+@functools.lru_cache(maxsize=None)
+def get_generative_model(model_name):
+    """
+    Returns a GenerativeModel for model_name, built once and reused across calls.
+    """
+    return genai.GenerativeModel(model_name=model_name)
+
+def _upload_pitch_deck(file_path, pdf_bytes, display_name):
+    """
+    Uploads the PDF to the Gemini API service and returns the file resource.
+    """
+    print(f"Uploading '{display_name}' to Google for analysis...")
+    uploaded_file_resource = genai.upload_file(
+        path=io.BytesIO(pdf_bytes) if pdf_bytes is not None else file_path,
+        mime_type="application/pdf",
+        display_name=display_name
+    )
+    print(f"Uploaded file '{uploaded_file_resource.display_name}' as: {uploaded_file_resource.uri}")
+    print(f"File State: {uploaded_file_resource.state.name}")
+    return uploaded_file_resource
+
+def _delete_uploaded_file(uploaded_file_resource):
+    """
+    Deletes an uploaded file from the Gemini service unless it is already gone.
+    """
+    if uploaded_file_resource and genai.get_file(uploaded_file_resource.name).state.name != "DELETED":
+        try:
+            print(f"Attempting to delete uploaded file: {uploaded_file_resource.name}")
+            genai.delete_file(uploaded_file_resource.name)
+            print(f"Successfully deleted file {uploaded_file_resource.name}.")
+        except Exception as delete_e:
+            print(f"Warning: Could not delete file {uploaded_file_resource.name}: {delete_e}")
+
+def summarize_pitch_deck_with_gemini(file_path, api_key, model_name, pdf_bytes=None, display_name=None):
     """
     Uploads a PDF to the Gemini API and generates a summary tailored for investors.
+    The PDF is read from file_path, or uploaded straight from memory when pdf_bytes is given.
     """
-    if not os.path.exists(file_path):
+    if pdf_bytes is None and not os.path.exists(file_path):
         print(f"Error: File not found at {file_path}")
         return None
+    display_name = display_name or os.path.basename(file_path or "pitch_deck.pdf")
 
     uploaded_file_resource = None # Keep track of the uploaded file resource for cleanup
     try:
         print(f"\nConfiguring Gemini API with model '{model_name}'...")
-        genai.configure(api_key=api_key)
+        configure_gemini(api_key)
 
         # 1. Upload the file to the Gemini API service
-        print(f"Uploading '{os.path.basename(file_path)}' to Google for analysis...")
-        uploaded_file_resource = genai.upload_file(
-            path=file_path,
-            display_name=os.path.basename(file_path)
-        )
-        print(f"Uploaded file '{uploaded_file_resource.display_name}' as: {uploaded_file_resource.uri}")
-        print(f"File State: {uploaded_file_resource.state.name}")
+        uploaded_file_resource = _upload_pitch_deck(file_path, pdf_bytes, display_name)
 
         # 2. Wait for the file to be processed by the API
         print("Waiting for file processing...")
         while uploaded_file_resource.state.name == "PROCESSING":
             print('.', end='', flush=True)
-            time.sleep(5) # Check status every 5 seconds
+            time.sleep(FILE_POLL_SECONDS)
             uploaded_file_resource = genai.get_file(uploaded_file_resource.name) # Fetch updated status
 
         if uploaded_file_resource.state.name != "ACTIVE":
             print(f"\nFile processing failed. Final state: {uploaded_file_resource.state.name}")
-            if uploaded_file_resource:
-                 print(f"Attempting to delete non-active file: {uploaded_file_resource.name}")
-                 genai.delete_file(uploaded_file_resource.name)
             return None
 
         print("\nFile processed successfully. Generating investor summary...")
 
-        # 3. Configure the generative model
-        model = genai.GenerativeModel(model_name=model_name)
+        # 3. Generate the summary with the (cached) model, the prompt and the uploaded file
+        response = get_generative_model(model_name).generate_content([PITCH_DECK_PROMPT, uploaded_file_resource])
 
-        # 4. Create a detailed prompt for investor-focused summarization
-        prompt = """
-        Analyze the provided startup pitch deck PDF from the perspective of a venture capital investor.
-        Generate a concise summary covering the key aspects an investor needs to evaluate the opportunity.
-        Structure the summary clearly, addressing the following points based *only* on the document's content:
+        print("Summary generated.")
+        return response.text
 
-        1.  **Problem:** Clearly state the core problem the startup addresses.
-        2.  **Solution:** Describe the startup's proposed solution.
-        3.  **Product/Service:** Briefly detail the offering.
-        4.  **Business Model:** Explain how the company intends to generate revenue.
-        5.  **Target Market & Opportunity:** Identify the customer segment and the market's size/potential.
-        6.  **Team:** Summarize key team members and their relevant background (if mentioned).
-        7.  **Traction/Milestones:** Highlight any achievements like user growth, revenue, partnerships, or completed milestones.
-        8.  **Competition:** List key competitors and the startup's differentiation (if provided).
-        9.  **Financials:** Summarize key financial data or projections presented.
-        10. **Funding Ask & Use:** State the amount of funding sought and its intended use.
-        11. **Investor Synopsis:** Conclude with a brief assessment of potential strengths, weaknesses, and overall investment appeal based *strictly* on the deck's content.
+    except Exception as e:
+        print(f"\nAn error occurred during Gemini interaction: {e}")
+        return None
 
-        Be objective and extract information accurately. If information for a section is not present in the PDF, state that clearly (e.g., "Financial projections were not provided.").
-        """
+    finally:
+        # 4. Clean up: Delete the file from the Gemini service
+        _delete_uploaded_file(uploaded_file_resource)
 
-        # 5. Generate the summary using the prompt and the uploaded file
-        response = model.generate_content([prompt, uploaded_file_resource])
+async def summarize_pitch_deck_with_gemini_async(file_path, api_key, model_name, pdf_bytes=None, display_name=None):
+    """
+    Async variant of summarize_pitch_deck_with_gemini for use inside request handlers.
+    Upload and cleanup run in worker threads, processing is polled without blocking the
+    event loop and the summary is generated with generate_content_async.
+    """
+    if pdf_bytes is None and not os.path.exists(file_path):
+        print(f"Error: File not found at {file_path}")
+        return None
+    display_name = display_name or os.path.basename(file_path or "pitch_deck.pdf")
 
-        print("Summary generated.")
+    uploaded_file_resource = None
+    try:
+        configure_gemini(api_key)
+        uploaded_file_resource = await asyncio.to_thread(_upload_pitch_deck, file_path, pdf_bytes, display_name)
+
+        while uploaded_file_resource.state.name == "PROCESSING":
+            await asyncio.sleep(FILE_POLL_SECONDS)
+            uploaded_file_resource = await asyncio.to_thread(genai.get_file, uploaded_file_resource.name)
+
+        if uploaded_file_resource.state.name != "ACTIVE":
+            print(f"File processing failed. Final state: {uploaded_file_resource.state.name}")
+            return None
+
+        response = await get_generative_model(model_name).generate_content_async(
+            [PITCH_DECK_PROMPT, uploaded_file_resource]
+        )
         return response.text
 
     except Exception as e:
-        print(f"\nAn error occurred during Gemini interaction: {e}")
+        print(f"An error occurred during Gemini interaction: {e}")
         return None
 
     finally:
-        # 6. Clean up: Delete the file from the Gemini service
-        if uploaded_file_resource and genai.get_file(uploaded_file_resource.name).state.name != "DELETED":
-            try:
-                print(f"Attempting to delete uploaded file: {uploaded_file_resource.name}")
-                genai.delete_file(uploaded_file_resource.name)
-                print(f"Successfully deleted file {uploaded_file_resource.name}.")
-            except Exception as delete_e:
-                print(f"Warning: Could not delete file {uploaded_file_resource.name}: {delete_e}")
+        await asyncio.to_thread(_delete_uploaded_file, uploaded_file_resource)
 
 # This will only run if summary.py is executed directly (not when imported)
 if __name__ == "__main__":
@@ -3,13 +3,20 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 import pandas as pd
 import time
 from dotenv import load_dotenv
 import os
 import io
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from selenium_utils import chromedriver_path, block_urls
+except ImportError:
+    from backend.pipeline.selenium_utils import chromedriver_path, block_urls
+
+# Chrome sessions scraping page ranges side by side in scrape_growjo_data_sharded
+GROWJO_SCRAPE_WORKERS = int(os.getenv("GROWJO_SCRAPE_WORKERS", "4"))
 
 def growjo_login():
     load_dotenv()
@@ -33,7 +40,9 @@ def growjo_login():
     }
     options.add_experimental_option("prefs", prefs)
     options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36")
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=ChromeService(chromedriver_path()), options=options)
+    # Skip media, fonts and trackers; stylesheets stay so the filters remain clickable
+    block_urls(driver)
 
     driver.get("https://growjo.com/login")
     wait = WebDriverWait(driver, 10)
@@ -66,7 +75,12 @@ def select_company_country(wait):
     print("✅ Selected 'United States'")
     time.sleep(20)
 
-def scrape_growjo_data_by_page(start_page: int, end_page: int = None):
+def scrape_growjo_data_by_page(start_page: int, end_page: int = None, strict: bool = False):
+    """
+    Scrape pages start_page..end_page (the last page when end_page is None) in one Chrome session.
+    Returns the CSV and the label of the page range actually scraped, or None if the start page
+    could not be reached. With strict=True an incomplete range raises RuntimeError instead.
+    """
     print("HI")
     wait, driver = growjo_login()
     select_company_country(wait)
@@ -86,6 +100,8 @@ def scrape_growjo_data_by_page(start_page: int, end_page: int = None):
         except Exception as e:
             print(f"❌ Couldn't navigate to start page {start_page}: {e}")
             driver.quit()
+            if strict:
+                raise RuntimeError(f"Couldn't navigate to start page {start_page}: {e}")
             return None
 
     if end_page is None:
@@ -104,6 +120,7 @@ def scrape_growjo_data_by_page(start_page: int, end_page: int = None):
     headers = []
     time.sleep(90)
     first_rows = []
+    skipped_pages = []
 
     while current_page <= end_page:
         try:
@@ -131,6 +148,7 @@ def scrape_growjo_data_by_page(start_page: int, end_page: int = None):
 
                 if retries == max_retries:
                     print(f"🚨 Skipping page {current_page} after {max_retries} retries due to no new data.")
+                    skipped_pages.append(current_page)
                     current_page += 1
                     if current_page <= end_page:
                         try:
@@ -185,14 +203,53 @@ def scrape_growjo_data_by_page(start_page: int, end_page: int = None):
             break
 
     df = pd.DataFrame(all_rows, columns=headers)
-    pages = f"{str(start_page).zfill(5)}_{str(end_page).zfill(5)}"
+    # The loop stops early on an error, so label the pages actually reached
+    last_page = min(current_page - 1, end_page)
+    pages = f"{str(start_page).zfill(5)}_{str(last_page).zfill(5)}"
 
     driver.quit()
 
+    if strict and (last_page < end_page or skipped_pages):
+        raise RuntimeError(
+            f"Pages {start_page}-{end_page} incomplete: stopped after page {last_page}, skipped pages {skipped_pages}"
+        )
+
     csv_buffer = io.StringIO()
     df.to_csv(csv_buffer, index=False)
     return csv_buffer.getvalue().encode(), pages
 
+def scrape_growjo_data_sharded(start_page: int, end_page: int, workers: int = GROWJO_SCRAPE_WORKERS):
+    """
+    Scrape pages start_page..end_page by splitting the range into contiguous shards,
+    each scraped by its own logged-in Chrome session in parallel.
+    Returns the merged CSV (one header, rows in page order) and the page range label.
+    Raises RuntimeError if any shard did not scrape its whole range, so a partial CSV is never uploaded as complete.
+    """
+    shard_size = -(-(end_page - start_page + 1) // workers)
+    shards = [(first, min(first + shard_size - 1, end_page))
+              for first in range(start_page, end_page + 1, shard_size)]
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [executor.submit(scrape_growjo_data_by_page, first, last, True) for first, last in shards]
+
+    # Keep the header of the first shard only; results are already in page order
+    csv_parts = []
+    failures = []
+    for (first, last), future in zip(shards, futures):
+        try:
+            csv_content = future.result()[0]
+        except Exception as e:
+            print(f"❌ Pages {first}-{last} could not be scraped: {e}")
+            failures.append(f"{first}-{last}")
+            continue
+        csv_parts.append(csv_content if not csv_parts else csv_content.split(b"\n", 1)[1])
+
+    if failures:
+        raise RuntimeError(f"Growjo pages {', '.join(failures)} were not fully scraped")
+
+    pages = f"{str(start_page).zfill(5)}_{str(end_page).zfill(5)}"
+    return b"".join(csv_parts), pages
+
 # def growjo_s3_upload():
 #     """
 #     This function is a wrapper for the scrape_growjo function.
@@ -1,5 +1,5 @@
 from backend.pipeline.scrape_growjo_page import scrape_growjo_data
-from backend.pipeline.growjo_pages_scrape import scrape_growjo_data_by_page
+from backend.pipeline.growjo_pages_scrape import scrape_growjo_data_sharded
 from datetime import datetime
 from backend.s3_utils import upload_file_to_s3
 
@@ -25,7 +25,7 @@ def growjo_s3_upload():
     It can be used to call the scraping process from other parts of the code.
     """
     print("ok")
-    csv_content, pages = scrape_growjo_data_by_page(5001,6000)
+    csv_content, pages = scrape_growjo_data_sharded(5001,6000)
     now = datetime.now()
 
     # Format the datetime to YYYY-MM-DD_HH-MM-SS
@@ -36,4 +36,5 @@ def growjo_s3_upload():
     upload_file_to_s3(csv_content, filename, folder=f"growjo-data/{formatted_time}")
     print(filename)
 
-growjo_s3_upload()
+if __name__ == "__main__":
+    growjo_s3_upload()
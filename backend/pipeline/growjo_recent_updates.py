@@ -1,25 +1,67 @@
+import os
+import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from lxml import html
+from lxml.etree import XPath
+try:
+    from selenium_utils import chromedriver_path, block_urls, READ_ONLY_BLOCKED_URL_PATTERNS
+except ImportError:
+    from backend.pipeline.selenium_utils import chromedriver_path, block_urls, READ_ONLY_BLOCKED_URL_PATTERNS
 
-def get_recent_updates():
+# XPath selectors for the recent funding cards, compiled once
+_XP_CARDS = XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' recent-card-maping ')]")
+_XP_COMPANY = XPath("(.//h4//a)[1]")
+_XP_SPANS = XPath(".//span")
+
+# Page listing the recent funding cards
+GROWJO_HOME_URL = "https://growjo.com/"
+
+# Skip the plain HTTP fetch and always render the page in Chrome
+USE_SELENIUM = os.getenv("GROWJO_USE_SELENIUM", "false").lower() == "true"
+
+# Keep-alive session for the plain HTTP fetch
+http_session = requests.Session()
+http_session.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"})
+
+def get_recent_updates(use_selenium: bool = USE_SELENIUM):
+    # Cards present in the served HTML need no browser; Chrome is the fallback for client-rendered pages
+    if not use_selenium:
+        try:
+            response = http_session.get(GROWJO_HOME_URL, timeout=30)
+            response.raise_for_status()
+            results = parse_card_data(html.fromstring(response.content))
+            if results:
+                return results
+            print("No cards in the served HTML, rendering the page in Chrome")
+        except Exception as e:
+            print(f"HTTP fetch of recent updates failed, rendering the page in Chrome: {e}")
+    return get_recent_updates_with_selenium()
+
+def get_recent_updates_with_selenium():
     # Setup driver
     options = webdriver.ChromeOptions()
     options.add_argument("--headless=new")  # Silent browsing
     options.add_argument("--window-size=1920,1080")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
     
     driver = webdriver.Chrome(
-        service=ChromeService(ChromeDriverManager().install()),
+        service=ChromeService(chromedriver_path()),
         options=options
     )
     
     try:
+        # Only the card text is read, so skip everything but the document and its scripts
+        block_urls(driver, READ_ONLY_BLOCKED_URL_PATTERNS)
+        
         # Directly access the updates page
-        driver.get("https://growjo.com/")  # Verify actual URL
+        driver.get(GROWJO_HOME_URL)
         
         # Wait for card content
         WebDriverWait(driver, 15).until(
@@ -27,24 +69,23 @@ def get_recent_updates():
         )
         
         # Parse data
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        return parse_card_data(soup)
+        return parse_card_data(html.fromstring(driver.page_source))
         
     finally:
         driver.quit()
 
-def parse_card_data(soup):
+def parse_card_data(tree):
     results = []
-    for div in soup.select("div.recent-card-maping"):
-        company = div.select_one("h4 a").get_text(strip=True)
-        spans = div.select("span")
+    for div in _XP_CARDS(tree):
+        company = _XP_COMPANY(div)[0].text_content().strip()
+        spans = [span.text_content() for span in _XP_SPANS(div)]
         
         results.append({
             "company": company,
-            "funding": spans[0].text.replace("Funding ", ""),
-            "valuation": spans[1].text.replace("Valuation: ", ""),
-            "revenue": spans[2].text.replace("Revenue ", ""),
-            "growth": spans[3].text.replace("Growth ", "")
+            "funding": spans[0].removeprefix("Funding "),
+            "valuation": spans[1].removeprefix("Valuation: "),
+            "revenue": spans[2].removeprefix("Revenue "),
+            "growth": spans[3].removeprefix("Growth ")
         })
     return results
 
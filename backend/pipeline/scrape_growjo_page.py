@@ -3,13 +3,59 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import pandas as pd
+from selenium.common.exceptions import TimeoutException
+from lxml import html
+from lxml.etree import XPath
+import csv
 import time
 from dotenv import load_dotenv
 import os
 import io
+try:
+    from selenium_utils import chromedriver_path, block_urls
+except ImportError:
+    from backend.pipeline.selenium_utils import chromedriver_path, block_urls
+
+# Also keep a local copy of the scraped CSV (debugging)
+SAVE_LOCAL_CSV = os.getenv("GROWJO_SAVE_LOCAL_CSV", "false").lower() == "true"
+
+# XPath selectors within the company table, compiled once and reused for every page
+_XP_HEADERS = XPath("./thead//th")
+_XP_ROWS = XPath("./tbody[1]//tr")
+_XP_CELLS = XPath(".//td")
+_XP_COMPANY_HREF = XPath(".//a[contains(@href, '/company/')]/@href")
+
+# Longest wait (seconds) for the page to react to a login, filter or pagination click
+PAGE_CHANGE_TIMEOUT = 30
+
+# Locators for the elements the scraper waits on
+COMPANIES_TAB = (By.XPATH, "//a[contains(@class, 'nav-link') and text()='Companies']")
+COMPANY_TABLE = (By.CSS_SELECTOR, "table.cstm-table")
+FIRST_TABLE_ROW = (By.CSS_SELECTOR, "table.cstm-table tbody tr:first-child")
+
+def _first_row_text(driver):
+    """Text of the first company row, or None while the table is not rendered"""
+    rows = driver.find_elements(*FIRST_TABLE_ROW)
+    try:
+        return rows[0].text.strip() if rows else None
+    except Exception:
+        # The row was replaced while reading it
+        return None
+
+def _wait_for_new_rows(driver, previous_first_row):
+    """Wait until the table's first row differs from previous_first_row (no-op on timeout)"""
+    try:
+        WebDriverWait(driver, PAGE_CHANGE_TIMEOUT).until(
+            lambda d: _first_row_text(d) not in (None, previous_first_row)
+        )
+    except TimeoutException:
+        print("⚠️ Table did not change in time, continuing")
+
+def _company_table(driver):
+    """Fetch only the company table's markup from Chrome and parse it with lxml"""
+    # One call for the table instead of serializing the whole page (or one call per cell)
+    table_html = driver.find_element(*COMPANY_TABLE).get_attribute("outerHTML")
+    return html.fragment_fromstring(table_html)
 
 def growjo_login():
     # Load environment variables
@@ -35,7 +81,9 @@ def growjo_login():
     }
     options.add_experimental_option("prefs", prefs)
     options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36")
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=ChromeService(chromedriver_path()), options=options)
+    # Skip media, fonts and trackers; stylesheets stay so the filters remain clickable
+    block_urls(driver)
 
     # Open login page
     driver.get("https://growjo.com/login")
@@ -46,21 +94,23 @@ def growjo_login():
     password_input.send_keys(GROWJO_PASSWORD)
     sign_in_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[text()='Sign In']")))
     sign_in_button.click()
-    time.sleep(10)
+    # Logged in once the Companies tab is usable
+    WebDriverWait(driver, PAGE_CHANGE_TIMEOUT).until(EC.element_to_be_clickable(COMPANIES_TAB))
     return wait, driver
 
-def select_company_country(wait):
+def select_company_country(wait, driver):
     # Navigate to the Companies tab
-    companies_tab = wait.until(EC.element_to_be_clickable((By.XPATH, "//a[contains(@class, 'nav-link') and text()='Companies']")))
+    companies_tab = wait.until(EC.element_to_be_clickable(COMPANIES_TAB))
     companies_tab.click()
-    time.sleep(8)
+    wait.until(EC.presence_of_element_located(FIRST_TABLE_ROW))
 
     # Clear all filters if present
     try:
         clear_all_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//a[@href='/search' and contains(text(),'Clear All')]")))
+        first_row = _first_row_text(driver)
         clear_all_button.click()
         print("🧹 Cleared all filters")
-        time.sleep(5)
+        _wait_for_new_rows(driver, first_row)
     except Exception as e:
         print("⚠️ Could not find or click the 'Clear All' button:", e)
 
@@ -68,57 +118,57 @@ def select_company_country(wait):
     dropdown_placeholder = wait.until(EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'select__placeholder') and contains(text(),'Select Country')]")))
     dropdown_placeholder.click()
     options_list = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//div[contains(@class, 'select__option')]")))
+    first_row = _first_row_text(driver)
     options_list[0].click()
     print("✅ Selected 'United States'")
-    time.sleep(20)
+    # The filtered table replaces the unfiltered one
+    _wait_for_new_rows(driver, first_row)
 
 
 def scrape_growjo_data():
     wait, driver = growjo_login()
-    select_company_country(wait)
+    select_company_country(wait, driver)
 
-    # Step 3: Scrape multiple pages
-    all_rows = []
+    # Step 3: Scrape multiple pages, writing rows straight into one in-memory CSV
+    csv_bytes = io.BytesIO()
+    csv_text = io.TextIOWrapper(csv_bytes, encoding='utf-8', newline='')
+    writer = csv.writer(csv_text, lineterminator='\n')
     headers = []
-    time.sleep(2)
     first_rows = []
 
     cnt = 1  # Start at page 1
     while True:
         # Explicitly wait for the current table to load
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'table.cstm-table')))
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        table = soup.find('table', {'class': 'cstm-table'})
+        wait.until(EC.presence_of_element_located(COMPANY_TABLE))
+        table = _company_table(driver)
 
         if not headers:
-            headers = [th.text.strip() for th in table.find('thead').find_all('th')]
+            headers = [th.text_content().strip() for th in _XP_HEADERS(table)]
+            writer.writerow(headers)
 
-        first_row_text = table.find('tbody').find('tr').text.strip()
+        first_row_text = _XP_ROWS(table)[0].text_content().strip()
         while first_row_text in first_rows:
             print("⏳ Waiting for new data to load...")
             time.sleep(1)
-             # Refresh the page source
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            table = soup.find('table', {'class': 'cstm-table'})
-            first_row_text = table.find('tbody').find('tr').text.strip()
+            # Refresh the table
+            table = _company_table(driver)
+            first_row_text = _XP_ROWS(table)[0].text_content().strip()
 
         first_rows.append(first_row_text)
 
 
         # Your scraping logic here
-        for tr in table.find('tbody').find_all('tr'):
-            cells = tr.find_all('td')
+        for tr in _XP_ROWS(table):
+            cells = _XP_CELLS(tr)
             row = []
             for idx, cell in enumerate(cells):
                 if idx == 1:
-                    anchors = cell.find_all('a')
-                    full_name = next((a.get('href').split('/')[-1].replace('_', ' ')
-                                    for a in anchors if a.get('href') and "/company/" in a.get('href')),
-                                    cell.text.strip())
+                    hrefs = _XP_COMPANY_HREF(cell)
+                    full_name = hrefs[0].split('/')[-1].replace('_', ' ') if hrefs else cell.text_content().strip()
                     row.append(full_name)
                 else:
-                    row.append(cell.text.strip())
-            all_rows.append(row)
+                    row.append(cell.text_content().strip())
+            writer.writerow(row)
 
         print(f"📄 Page {cnt} scraped.")
         cnt += 1
@@ -126,22 +176,23 @@ def scrape_growjo_data():
         # Find and click "Next" button reliably
         try:
             next_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//li[@class='next']/a[@href]")))
+            first_row = _first_row_text(driver)
             driver.execute_script("arguments[0].click();", next_button)
-            time.sleep(3)
+            _wait_for_new_rows(driver, first_row)
         except Exception as e:
             print(f"✅ Reached last page or pagination error: {e}")
             break
 
-    # Save to CSV
-    df = pd.DataFrame(all_rows, columns=headers)
-    df.to_csv("new_pipeline.csv", index=False)
-    # print(f"✅ Saved data to: {filename}")
-
     # Cleanup
     driver.quit()
 
-    # In-memory CSV
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    return csv_buffer.getvalue().encode()
+    # Hand back the CSV bytes; detaching keeps the buffer open once the text wrapper is gone
+    csv_text.flush()
+    csv_text.detach()
+    csv_content = csv_bytes.getvalue()
+
+    if SAVE_LOCAL_CSV:
+        with open("new_pipeline.csv", "wb") as f:
+            f.write(csv_content)
 
+    return csv_content
@@ -0,0 +1,23 @@
+from functools import lru_cache
+from selenium import webdriver
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Requests the scrapers never need (they only read DOM text): media, fonts and trackers
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff*", "*.ttf", "*.otf",
+    "*googletagmanager*", "*google-analytics*", "*doubleclick*", "*facebook.net*", "*hotjar*",
+]
+
+# Pages that are only read, never clicked through, can skip stylesheets as well
+READ_ONLY_BLOCKED_URL_PATTERNS = BLOCKED_URL_PATTERNS + ["*.css"]
+
+def block_urls(driver: webdriver.Chrome, patterns=BLOCKED_URL_PATTERNS):
+    """Stop Chrome from fetching URLs matching the patterns (via the DevTools protocol)"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+@lru_cache(maxsize=1)
+def chromedriver_path() -> str:
+    """Install (or find) chromedriver once per process and reuse its path"""
+    return ChromeDriverManager().install()
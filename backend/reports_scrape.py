@@ -1,6 +1,7 @@
+import io
 import os
 import requests
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 import google.generativeai as genai
@@ -16,6 +17,13 @@ load_dotenv()
 genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
 GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')  # Using vision model for PDF analysis
 
+# One keep-alive session for every report download, so repeated hosts reuse their TLS connection
+http_session = requests.Session()
+http_session.headers.update({"User-Agent": "Mozilla/5.0"})
+
+# Reports summarized and stored concurrently
+REPORT_WORKERS = 4
+
 # Directory to store reports
 REPORTS_DIR = Path("reports")
 REPORTS_DIR.mkdir(exist_ok=True) 
@@ -59,20 +67,11 @@ DIRECT_PDFS = {
 
 def get_report_summary_with_gemini(pdf_content: bytes, filename: str) -> str:
     """Generate comprehensive summary of report using Gemini"""
-    temp_pdf = None
     try:
         model = genai.GenerativeModel(model_name=GEMINI_MODEL)
         
-        # Create a temporary file with a unique name
-        temp_pdf = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-        temp_pdf_path = temp_pdf.name
-        
-        # Write content and close file handle immediately
-        temp_pdf.write(pdf_content)
-        temp_pdf.close()
-        
-        # Upload the file to Gemini
-        file = genai.upload_file(temp_pdf_path)
+        # Upload the PDF to Gemini straight from memory
+        file = genai.upload_file(io.BytesIO(pdf_content), mime_type="application/pdf", display_name=filename)
         
         prompt = """
         Analyze this industry/market report comprehensively and generate a detailed summary. Consider text as well as images or graphs in the report. 
@@ -120,136 +119,100 @@ def get_report_summary_with_gemini(pdf_content: bytes, filename: str) -> str:
         # Generate summary using the file and prompt
         response = model.generate_content([prompt, file])
         
-        # Clean up: Delete the temporary file
-        try:
-            os.unlink(temp_pdf_path)
-        except Exception as e:
-            print(f"Warning: Could not delete temporary file {temp_pdf_path}: {e}")
-        
         return response.text
             
     except Exception as e:
         print(f"Error generating summary with Gemini for {filename}: {e}")
-        # Attempt to clean up even if there was an error
-        if temp_pdf is not None:
-            try:
-                os.unlink(temp_pdf.name)
-            except Exception as cleanup_error:
-                print(f"Warning: Could not delete temporary file during error cleanup: {cleanup_error}")
         return None
 
+def store_report(pdf_content: bytes, report_name: str, industry: str) -> None:
+    """Summarize one report and store it in S3, Snowflake and Pinecone"""
+    # Generate summary using Gemini
+    print(f"Generating summary for {report_name}")
+    summary = get_report_summary_with_gemini(pdf_content, report_name)
+    if not summary:
+        return
+    
+    # Upload PDF to S3
+    presigned_url = upload_pdf_to_s3(
+        file_content=pdf_content,
+        filename=f"{report_name}.pdf",
+        industry=industry
+    )
+    
+    # Store in Snowflake
+    store_report_summary(
+        report_id=report_name,
+        industry=industry,
+        summary=summary
+    )
+    
+    # Store in Pinecone
+    chunks = markdown_header_chunks(summary)
+    embeddings_data = []
+    for chunk, embedding in zip(chunks, generate_embeddings(chunks)):
+        embeddings_data.append({
+            'content': chunk,
+            'embedding': embedding,
+            'metadata': {
+                'industry': industry,
+                'year': '2024',
+                'document_id': report_name
+            }
+        })
+    
+    store_in_pinecone(embeddings_data, index_name="deloitte-reports")
+    print(f"Successfully processed and stored {report_name}")
+
+def process_direct_pdf(name: str, url: str) -> None:
+    """Download a report PDF and store it"""
+    try:
+        industry = name.split('_')[0]
+        response = http_session.get(url, timeout=60)
+        if response.status_code == 200:
+            store_report(response.content, name, industry)
+    except Exception as e:
+        print(f"Error processing {name}: {e}")
+
+def store_rendered_report(pdf_content: bytes, pdf_name: str, industry: str, url: str) -> None:
+    """Store a report rendered from a web page"""
+    try:
+        store_report(pdf_content, pdf_name, industry)
+    except Exception as e:
+        print(f"Error processing {url}: {str(e)}")
+
 def process_reports_pipeline():
     """Process reports through S3, Gemini, Snowflake, and Pinecone"""
     try:
         # Initialize Snowflake objects
         initialize_snowflake_objects()
         
-        # Step 1: Process direct PDF URLs
-        pdf_files = []
-        for name, url in DIRECT_PDFS.items():
-            try:
-                industry = name.split('_')[0]
-                response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-                if response.status_code == 200:
-                    pdf_content = response.content
-                    
-                    # Generate summary using Gemini
-                    print(f"Generating summary for {name}")
-                    summary = get_report_summary_with_gemini(pdf_content, name)
-                    
-                    if summary:
-                        # Upload PDF to S3
-                        presigned_url = upload_pdf_to_s3(
-                            file_content=pdf_content,
-                            filename=f"{name}.pdf",
-                            industry=industry
-                        )
-                        
-                        # Store in Snowflake
-                        store_report_summary(
-                            report_id=name,
-                            industry=industry,
-                            summary=summary
-                        )
-                        
-                        # Store in Pinecone
-                        chunks = markdown_header_chunks(summary)
-                        embeddings_data = []
-                        for chunk in chunks:
-                            embedding = generate_embeddings(chunk)
-                            embeddings_data.append({
-                                'content': chunk,
-                                'embedding': embedding,
-                                'metadata': {
-                                    'industry': industry,
-                                    'year': '2024',
-                                    'document_id': name
-                                }
-                            })
-                        
-                        store_in_pinecone(embeddings_data, index_name="deloitte-reports")
-                        print(f"Successfully processed and stored {name}")
-                        
-            except Exception as e:
-                print(f"Error processing {name}: {e}")
-
-        # Step 2: Process print-scraped PDFs
-        for filename, urls in PRINT_URLS.items():
-            industry = filename.split('_')[0]
-            for i, url in enumerate(urls):
-                try:
-                    with sync_playwright() as p:
-                        browser = p.chromium.launch()
-                        page = browser.new_page()
-                        print(f"Visiting: {url}")
-                        page.goto(url, timeout=60000)
-                        page.wait_for_timeout(3000)
-                        
-                        # Generate PDF content  
-                        pdf_content = page.pdf()
-                        browser.close()
-                        
-                        pdf_name = f"{filename}_{i+1}"
-                        
-                        # Generate summary using Gemini
-                        print(f"Generating summary for {pdf_name}")
-                        summary = get_report_summary_with_gemini(pdf_content, pdf_name)
-                        
-                        if summary:
-                            # Upload PDF to S3
-                            presigned_url = upload_pdf_to_s3(
-                                file_content=pdf_content,
-                                filename=f"{pdf_name}.pdf",
-                                industry=industry
-                            )
-                            
-                            # Store in Snowflake
-                            store_report_summary(
-                                report_id=pdf_name,
-                                industry=industry,
-                                summary=summary
-                            )
-                            
-                            # Store in Pinecone
-                            chunks = markdown_header_chunks(summary)
-                            embeddings_data = []
-                            for chunk in chunks:
-                                embedding = generate_embeddings(chunk)
-                                embeddings_data.append({
-                                    'content': chunk,
-                                    'embedding': embedding,
-                                    'metadata': {
-                                        'industry': industry,
-                                        'year': '2024',
-                                        'document_id': pdf_name
-                                    }
-                                })
-                            
-                            store_in_pinecone(embeddings_data, index_name="deloitte-reports")
-                            print(f"Successfully processed and stored {pdf_name}")
+        # Reports are independent, so their Gemini/S3/Snowflake/Pinecone work runs in parallel
+        with ThreadPoolExecutor(max_workers=REPORT_WORKERS) as executor:
+            # Step 1: Process direct PDF URLs
+            for name, url in DIRECT_PDFS.items():
+                executor.submit(process_direct_pdf, name, url)
+            
+            # Step 2: Process print-scraped PDFs; pages render here (Playwright's sync API
+            # stays on this thread) while earlier reports are processed in the pool
+            for filename, urls in PRINT_URLS.items():
+                industry = filename.split('_')[0]
+                for i, url in enumerate(urls):
+                    try:
+                        with sync_playwright() as p:
+                            browser = p.chromium.launch()
+                            page = browser.new_page()
+                            print(f"Visiting: {url}")
+                            page.goto(url, timeout=60000)
+                            page.wait_for_timeout(3000)
                             
-                except Exception as e:
-                    print(f"Error processing {url}: {str(e)}")
+                            # Generate PDF content  
+                            pdf_content = page.pdf()
+                            browser.close()
+                        
+                        executor.submit(store_rendered_report, pdf_content, f"{filename}_{i+1}", industry, url)
+                    except Exception as e:
+                        print(f"Error processing {url}: {str(e)}")
 
     except Exception as e:
         print(f"Error in pipeline: {str(e)}")
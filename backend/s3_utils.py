@@ -1,5 +1,9 @@
 import os
+import io
+import mimetypes
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from dotenv import load_dotenv
 import datetime
 import os.path
@@ -13,12 +17,38 @@ aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY')
 aws_region = os.getenv('AWS_REGION')
 bucket_name = os.getenv('AWS_S3_BUCKET_NAME')
 
-# Initialize a session using AWS credentials
-s3_client = boto3.client(
-    's3',
-    region_name=aws_region,
+# HTTP connections kept open (with TCP keepalive) by the shared client, enough for concurrent request threads
+S3_MAX_POOL_CONNECTIONS = 50
+
+# Uploads (pitch decks, scraped CSVs) above 8 MB go up as concurrent 8 MB multipart parts
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True
+)
+
+# Lifetime (seconds) of the presigned PUT URL a browser uses to upload a pitch deck
+PITCH_DECK_UPLOAD_URL_EXPIRATION = 300
+
+# Initialize a session using AWS credentials once; the credential chain is resolved here at import
+# rather than on the first request
+session = boto3.session.Session(
     aws_access_key_id=aws_access_key_id,
-    aws_secret_access_key=aws_secret_access_key
+    aws_secret_access_key=aws_secret_access_key,
+    region_name=aws_region
+)
+session.get_credentials()
+
+# One pooled client derived from the session is shared (thread-safely) by the whole process
+s3_client = session.client(
+    's3',
+    config=Config(
+        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        tcp_keepalive=True,
+        s3={"addressing_style": "virtual"}
+    )
 )
 
 def generate_presigned_url(bucket_name: str, object_key: str, expiration: int = 3600) -> str:
@@ -47,11 +77,38 @@ def generate_presigned_url(bucket_name: str, object_key: str, expiration: int =
         print(f"Error generating presigned URL: {e}")
         return None
 
+def generate_presigned_upload_url(bucket_name: str, object_key: str, expiration: int = PITCH_DECK_UPLOAD_URL_EXPIRATION) -> str:
+    """
+    Generate a presigned URL that lets a client PUT a PDF straight into S3
+    
+    Args:
+        bucket_name: Name of the S3 bucket
+        object_key: Key the object will be stored under
+        expiration: URL expiration time in seconds (default 5 minutes)
+    
+    Returns:
+        Presigned PUT URL for the object
+    """
+    try:
+        url = s3_client.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': bucket_name,
+                'Key': object_key,
+                'ContentType': 'application/pdf'
+            },
+            ExpiresIn=expiration
+        )
+        return url
+    except Exception as e:
+        print(f"Error generating presigned upload URL: {e}")
+        return None
+
 def upload_file_to_s3(file_content, filname, folder=None):
     """
     Uploads file content (e.g., csv) directly to S3.
 
-    :param file_content: Binary content of the file.
+    :param file_content: Binary content of the file, or a binary file-like object.
     :param s3_key: Name of the file in S3.
     :param folder: Optional folder name in the S3 bucket (default is None).
     :return: True if upload is successful, False otherwise.
@@ -60,8 +117,10 @@ def upload_file_to_s3(file_content, filname, folder=None):
         # If a folder is specified, prepend it to the key
         s3_key = f"{folder}/{filname}"
 
-        # Upload the binary content to S3
-        s3_client.put_object(Bucket=bucket_name, Key=s3_key, Body=file_content)
+        # Upload the content to S3; large files are split into parts uploaded in parallel
+        fileobj = io.BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+        content_type = mimetypes.guess_type(filname)[0] or "application/octet-stream"
+        s3_client.upload_fileobj(fileobj, bucket_name, s3_key, Config=S3_TRANSFER_CONFIG, ExtraArgs={"ContentType": content_type})
         print(f"File uploaded successfully to {bucket_name}/{s3_key}")
         return f"https://{bucket_name}.s3.{aws_region}.amazonaws.com/{s3_key}"
     except Exception as e:
@@ -141,70 +200,104 @@ def get_s3_object(s3_key: str) -> str:
         print(f"Error getting S3 object: {e}")
         return None
 
-def upload_pitch_deck_to_s3(file_path, startup_name=None, industry=None, original_filename=None):
+def get_s3_object_bytes(s3_key: str) -> bytes:
+    """
+    Get the raw content of an S3 object by its key
+    
+    Args:
+        s3_key: The S3 key of the object
+    
+    Returns:
+        The content of the object as bytes
+    """
+    try:
+        response = s3_client.get_object(Bucket=bucket_name, Key=s3_key)
+        return response['Body'].read()
+    except Exception as e:
+        print(f"Error getting S3 object: {e}")
+        return None
+
+def build_pitch_deck_key(startup_name=None, industry=None, original_filename=None) -> str:
+    """
+    Build the S3 key a pitch deck is stored under.
+    
+    Args:
+        startup_name: Name of the startup
+        industry: Industry category
+        original_filename: Original filename of the PDF
+    
+    Returns:
+        S3 key in the pitchdecks/{industry} folder
+    """
+    # Generate a timestamp
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # Determine the base filename
+    if original_filename:
+        # Use the original filename without path or extension
+        base_filename = os.path.splitext(os.path.basename(original_filename))[0]
+    else:
+        # Fallback to a default name
+        base_filename = "pitch_deck"
+    
+    # Clean up the filename - replace spaces and special chars with underscores
+    base_filename = ''.join(c if c.isalnum() else '_' for c in base_filename)
+    
+    # Create the S3 object name
+    # Format: [Filename]_[Timestamp].pdf
+    s3_object_name = f"{base_filename}_{timestamp}.pdf"
+    
+    # Add startup name and industry prefixes if they're valid values
+    prefix = ""
+    if startup_name and startup_name.lower() != "unknown":
+        safe_name = ''.join(c if c.isalnum() else '_' for c in startup_name)
+        prefix += f"{safe_name}_"
+    
+    if industry and industry.lower() != "unknown":
+        safe_industry = ''.join(c if c.isalnum() else '_' for c in industry)
+        prefix += f"{safe_industry}_"
+    
+    # Combine prefix with the base filename and timestamp
+    if prefix:
+        s3_object_name = f"{prefix}{s3_object_name}"
+    
+    # Create the complete S3 key with proper folder structure
+    # Store pitch decks in pitchdecks/{industry} folder
+    return f"pitchdecks/{industry}/{s3_object_name}"
+
+def upload_pitch_deck_to_s3(file_path=None, startup_name=None, industry=None, original_filename=None, file_bytes=None):
     """
     Uploads a pitch deck PDF file to S3 and returns a presigned URL for access.
     This function combines the naming logic from summary.py's upload_to_s3 and
     the presigned URL generation from s3_utils.py's upload_pdf_to_s3.
     
     Args:
-        file_path: Path to the PDF file
+        file_path: Path to the PDF file (used when file_bytes is not given)
         startup_name: Name of the startup
         industry: Industry category
         original_filename: Original filename of the PDF
+        file_bytes: PDF content already in memory
     
     Returns:
         Presigned URL of the uploaded file
     """
     try:
         # Validate file exists
-        if not os.path.exists(file_path):
+        if file_bytes is None and not os.path.exists(file_path):
             print(f"Error: File not found at {file_path}")
             return None
-        print("File exists")
-        # Generate a timestamp
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Determine the base filename
-        if original_filename:
-            # Use the original filename without path or extension
-            base_filename = os.path.splitext(os.path.basename(original_filename))[0]
-        else:
-            # Fallback to a default name
-            base_filename = "pitch_deck"
-        
-        # Clean up the filename - replace spaces and special chars with underscores
-        base_filename = ''.join(c if c.isalnum() else '_' for c in base_filename)
-        
-        # Create the S3 object name
-        # Format: [Filename]_[Timestamp].pdf
-        s3_object_name = f"{base_filename}_{timestamp}.pdf"
-        
-        # Add startup name and industry prefixes if they're valid values
-        prefix = ""
-        if startup_name and startup_name.lower() != "unknown":
-            safe_name = ''.join(c if c.isalnum() else '_' for c in startup_name)
-            prefix += f"{safe_name}_"
+        # Name the object after the startup, industry and original filename
+        s3_key = build_pitch_deck_key(startup_name, industry, original_filename)
+        s3_object_name = os.path.basename(s3_key)
         
-        if industry and industry.lower() != "unknown":
-            safe_industry = ''.join(c if c.isalnum() else '_' for c in industry)
-            prefix += f"{safe_industry}_"
-        
-        # Combine prefix with the base filename and timestamp
-        if prefix:
-            s3_object_name = f"{prefix}{s3_object_name}"
-        
-        # Create the complete S3 key with proper folder structure
-        # Store pitch decks in pitchdecks/{industry} folder
-        s3_key = f"pitchdecks/{industry}/{s3_object_name}"
-        
-        # Upload the file to S3
-        with open(file_path, 'rb') as file_data:
-            s3_client.put_object(
-                Bucket=bucket_name,
-                Key=s3_key,
-                Body=file_data.read()
-            )
+        # Upload the file to S3, straight from memory when the content is already there;
+        # large decks are split into parts uploaded in parallel
+        if file_bytes is None:
+            with open(file_path, 'rb') as file_data:
+                s3_client.upload_fileobj(file_data, bucket_name, s3_key, Config=S3_TRANSFER_CONFIG)
+        else:
+            s3_client.upload_fileobj(io.BytesIO(file_bytes), bucket_name, s3_key, Config=S3_TRANSFER_CONFIG)
         print(f"Pitch deck uploaded successfully to {bucket_name}/{s3_key}")
         
         # Generate presigned URL (valid for 1 hour)
@@ -5,6 +5,8 @@ from typing_extensions import TypedDict
 
 class AnalysisState(TypedDict):
     pdf_file_path: str
+    pdf_bytes: Optional[bytes]  # Uploaded PDF held in memory (instead of pdf_file_path)
+    s3_key: Optional[str]  # Set when the client uploaded the PDF to S3 itself
     startup_name: str
     industry: str
     linkedin_urls: Optional[List[str]]
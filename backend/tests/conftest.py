@@ -0,0 +1,62 @@
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock
+from tests.mocks.service_mocks import MockConnection, MockCursor, MockPinecone
+
+# Environment the app modules read at import time
+TEST_ENV = {
+    "SUPABASE_URL": "https://example.supabase.co",
+    "SUPABASE_KEY": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJlZiI6InR3aXNqZWNuc3lvZ2VoYWZmcWpwIiwicm9sZSI6ImFub24iLCJpYXQiOjE2NzI3MzgxMDYsImV4cCI6MTk4ODMxNDEwNn0.mock_key",
+    "AWS_ACCESS_KEY_ID": "dummy",
+    "AWS_SECRET_ACCESS_KEY": "dummy",
+    "AWS_S3_BUCKET_NAME": "dummy",
+    "AWS_REGION": "us-east-1",
+    "GEMINI_API_KEY": "dummy",
+    "PINECONE_API_KEY": "dummy",
+    "SNOWFLAKE_USER": "dummy",
+    "SNOWFLAKE_PASSWORD": "dummy",
+    "SNOWFLAKE_ACCOUNT": "dummy",
+    "SNOWFLAKE_WAREHOUSE": "dummy",
+    "SNOWFLAKE_DATABASE": "INVESTOR_INTEL_DB",
+    "SNOWFLAKE_ROLE": "dummy",
+}
+
+def pytest_configure(config):
+    """Set the environment and mock external services once, before any test module imports app code"""
+    os.environ.update(TEST_ENV)
+
+    # Mock Snowflake
+    sys.modules['snowflake'] = MagicMock()
+    sys.modules['snowflake.connector'] = MagicMock()
+    sys.modules['snowflake.connector'].connect = MagicMock(return_value=MockConnection())
+
+    # Mock Pinecone
+    sys.modules['pinecone'] = MagicMock()
+    sys.modules['pinecone'].Pinecone = MockPinecone
+    sys.modules['pinecone'].ServerlessSpec = MagicMock()
+
+    # Mock the embedding model
+    sys.modules['sentence_transformers'] = MagicMock()
+    mock_embedding_model = MagicMock()
+    mock_embedding_model.encode.return_value.tolist.return_value = [0.1, 0.2, 0.3]
+    sys.modules['sentence_transformers'].SentenceTransformer = MagicMock(return_value=mock_embedding_model)
+
+    # Mock the Supabase client
+    sys.modules['supabase'] = MagicMock()
+    sys.modules['supabase._sync.client'] = MagicMock()
+    sys.modules['supabase._sync.client'].create_client = MagicMock()
+    sys.modules['supabase._sync.client'].Client = MagicMock()
+
+    # Mock the database modules
+    sys.modules['database'] = MagicMock()
+    sys.modules['database.log_gemini_interaction'] = MagicMock()
+    sys.modules['database.snowflake_connect'] = MagicMock()
+    sys.modules['database.snowflake_connect'].get_connection = MagicMock(return_value=(MockConnection(), MockCursor()))
+
+@pytest.fixture(scope="session")
+def client():
+    """One FastAPI TestClient for the whole run"""
+    from fastapi.testclient import TestClient
+    from main import app
+    return TestClient(app)
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+# Mock classes for Snowflake
+class MockConnection:
+    def __init__(self):
+        self.closed = False
+        
+    def close(self):
+        self.closed = True
+        
+    def commit(self):
+        pass
+
+class MockCursor:
+    def __init__(self):
+        self.closed = False
+        self.description = [("COLUMN",)]
+        
+    def close(self):
+        self.closed = True
+    
+    def execute(self, *args, **kwargs):
+        return None
+        
+    def fetchall(self):
+        return []
+
+# Mock Pinecone
+class MockPinecone:
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+
+    def list_indexes(self):
+        return [{"name": "investor-intel"}, {"name": "deloitte-reports"}]
+
+    def Index(self, name, **kwargs):
+        mock_index = MagicMock()
+        mock_index.describe_index_stats.return_value = {"namespaces": {}}
+        mock_index.query.return_value = {"matches": []}
+        return mock_index
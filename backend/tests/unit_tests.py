@@ -1,103 +1,36 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import os
-import sys
-
-# Set environment variables before importing any modules
-os.environ.update({
-    "SUPABASE_URL": "https://example.supabase.co",
-    "SUPABASE_KEY": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJlZiI6InR3aXNqZWNuc3lvZ2VoYWZmcWpwIiwicm9sZSI6ImFub24iLCJpYXQiOjE2NzI3MzgxMDYsImV4cCI6MTk4ODMxNDEwNn0.mock_key",
-    "AWS_ACCESS_KEY_ID": "dummy",
-    "AWS_SECRET_ACCESS_KEY": "dummy",
-    "AWS_S3_BUCKET_NAME": "dummy",
-    "AWS_REGION": "us-east-1",
-    "GEMINI_API_KEY": "dummy",
-    "PINECONE_API_KEY": "dummy",
-    "SNOWFLAKE_USER": "dummy",
-    "SNOWFLAKE_PASSWORD": "dummy",
-    "SNOWFLAKE_ACCOUNT": "dummy",
-    "SNOWFLAKE_WAREHOUSE": "dummy",
-    "SNOWFLAKE_DATABASE": "INVESTOR_INTEL_DB",
-    "SNOWFLAKE_ROLE": "dummy",
-})
-
-# Mock Pinecone before importing anything that uses it
-class MockPinecone:
-    def __init__(self, api_key=None):
-        self.api_key = api_key
-
-    def list_indexes(self):
-        return [{"name": "investor-intel"}]
-
-    def Index(self, name):
-        mock_index = MagicMock()
-        mock_index.describe_index_stats.return_value = {"namespaces": {}}
-        return mock_index
-
-# Mock the Pinecone module
-sys.modules['pinecone'] = MagicMock()
-sys.modules['pinecone'].Pinecone = MockPinecone
-sys.modules['pinecone'].ServerlessSpec = MagicMock()
-
-# Create mock for snowflake connection
-class MockConnection:
-    def __init__(self):
-        self.closed = False
-        
-    def close(self):
-        self.closed = True
-        
-class MockCursor:
-    def __init__(self):
-        self.closed = False
-        self.description = [("COLUMN",)]
-        
-    def close(self):
-        self.closed = True
-    
-    def execute(self, *args, **kwargs):
-        return None
-        
-    def fetchall(self):
-        return []
-
-# Mock the database modules
-sys.modules['database'] = MagicMock()
-sys.modules['database.log_gemini_interaction'] = MagicMock()
-sys.modules['database.snowflake_connect'] = MagicMock()
-sys.modules['database.snowflake_connect'].get_connection = MagicMock(return_value=(MockConnection(), MockCursor()))
-
-# Mock the embedding model
-sys.modules['sentence_transformers'] = MagicMock()
-sys.modules['sentence_transformers'].SentenceTransformer = MagicMock()
-mock_model = MagicMock()
-mock_model.encode.return_value.tolist.return_value = [0.1, 0.2, 0.3]
-sys.modules['sentence_transformers'].SentenceTransformer.return_value = mock_model
-
-# Add path to parent directory
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-# Now import the modules that depend on these
-from fastapi.testclient import TestClient
-from main import app
+import asyncio
+import json
+import threading
+
+from tests.mocks.service_mocks import MockConnection, MockCursor
+
+# Env and service mocks are installed by conftest.py before these imports
 from s3_utils import generate_presigned_url, upload_pitch_deck_to_s3
 from vector_storage_service import get_embedding_model, generate_embeddings
 from langgraph_builder import fetch_summary, fetch_industry_report, fetch_competitors
 
 # --- FastAPI Tests ---
-client = TestClient(app)
-
-def test_root_endpoint():
+def test_root_endpoint(client):
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to the InvestorIntel API"}
     
-def test_health_check():
+def test_health_check(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json().get("status") == "ok"
 
 
+def test_graph_and_api_share_one_embedding_manager():
+    import main
+    import langgraph_builder
+
+    assert langgraph_builder.embedding_manager is main.embedding_manager
+
+
 # --- S3 Utils Tests ---
 @patch('s3_utils.s3_client')
 def test_generate_presigned_url(mock_s3_client):
@@ -128,19 +61,38 @@ def test_upload_pitch_deck_to_s3(mock_open, mock_exists, mock_s3_client):
     )
     
     # Assert
-    assert mock_s3_client.put_object.called
+    assert mock_s3_client.upload_fileobj.call_args[0][0] is mock_file
     assert mock_s3_client.generate_presigned_url.called
     assert result == "https://example.com/presigned-url"
 
 
+@patch('s3_utils.s3_client')
+def test_upload_file_to_s3_streams_bytes_as_multipart_csv(mock_s3_client):
+    from s3_utils import upload_file_to_s3, S3_TRANSFER_CONFIG
+
+    result = upload_file_to_s3(b"a,b\n1,2\n", "data.csv", folder="growjo-data")
+
+    fileobj, _, key = mock_s3_client.upload_fileobj.call_args[0]
+    assert fileobj.read() == b"a,b\n1,2\n"
+    assert key == "growjo-data/data.csv"
+    assert mock_s3_client.upload_fileobj.call_args[1] == {"Config": S3_TRANSFER_CONFIG, "ExtraArgs": {"ContentType": "text/csv"}}
+    assert result.endswith("/growjo-data/data.csv")
+
 # --- Vector Storage Tests ---
+@pytest.fixture
+def fresh_embedding_model_cache():
+    get_embedding_model.cache_clear()
+    yield
+    get_embedding_model.cache_clear()
+
 @patch('vector_storage_service.SentenceTransformer')
-def test_get_embedding_model(mock_transformer):
+def test_get_embedding_model(mock_transformer, fresh_embedding_model_cache):
     mock_model = MagicMock()
     mock_transformer.return_value = mock_model
     
     model = get_embedding_model()
     
+    assert get_embedding_model() is model
     mock_transformer.assert_called_once()
     assert model == mock_model
     
@@ -242,7 +194,7 @@ def test_fetch_competitors(mock_get_companies):
 # --- Chat Endpoint Test ---
 @patch('main.embedding_manager.search_similar_startups')
 @patch('main.gemini_assistant.process_query_with_results')
-def test_chat_endpoint(mock_process_query, mock_search):
+def test_chat_endpoint(mock_process_query, mock_search, client):
     # Setup mock data
     mock_search.return_value = [
         {"source": "startup", "text": "Test startup info"},
@@ -263,3 +215,676 @@ def test_chat_endpoint(mock_process_query, mock_search):
     assert data["response"] == "Here's information about your query"
     assert data["startup_count"] == 1
     assert data["report_count"] == 1
+
+@patch('main.embedding_manager.search_similar_startups')
+@patch('main.gemini_assistant.process_query_with_results')
+def test_chat_endpoint_gzips_large_responses(mock_process_query, mock_search, client):
+    mock_search.return_value = [{"source": "startup", "text": "Test startup info"}]
+    mock_process_query.return_value = "• Long answer line\n" * 200
+
+    response = client.post("/chat", json={"query": "Tell me about AI startups"}, headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["response"] == mock_process_query.return_value
+
+# --- Pitch Deck Endpoint Tests ---
+@patch('main.generate_presigned_upload_url')
+def test_presign_pitch_deck_returns_upload_url_and_key(mock_presign, client):
+    mock_presign.return_value = "https://example.com/put-url"
+
+    response = client.post("/pitch-deck/presign", json={"startup_name": "TestStartup", "industry": "AI", "filename": "deck.pdf"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["upload_url"] == "https://example.com/put-url"
+    assert data["s3_key"].startswith("pitchdecks/AI/TestStartup_AI_deck_")
+    assert mock_presign.call_args[0][1] == data["s3_key"]
+
+@patch('main.get_s3_object_bytes')
+def test_process_pitch_deck_reads_presigned_upload_from_s3(mock_get_bytes, client):
+    mock_get_bytes.return_value = b"%PDF-1.4"
+    mock_graph = MagicMock()
+    mock_graph.ainvoke = AsyncMock(return_value={"s3_location": "https://example.com/get-url"})
+
+    with patch('main.graph', mock_graph):
+        response = client.post("/process-pitch-deck", data={"s3_key": "pitchdecks/AI/deck.pdf", "startup_name": "TestStartup"})
+
+    assert response.status_code == 200
+    mock_get_bytes.assert_called_once_with("pitchdecks/AI/deck.pdf")
+    state = mock_graph.ainvoke.call_args[0][0]
+    assert state["pdf_bytes"] == b"%PDF-1.4"
+    assert state["s3_key"] == "pitchdecks/AI/deck.pdf"
+    assert response.json()["original_filename"] == "deck.pdf"
+
+# --- Embedding Manager Tests ---
+def test_cached_encode_reuses_query_embedding(tmp_path):
+    import numpy as np
+    from pinecone_pipeline import embedding_manager as em
+
+    model = MagicMock()
+    model.encode.return_value = np.array([[0.5, 0.25, 0.125]], dtype=np.float32)
+    with patch.object(em, '_get_model', return_value=model), \
+         patch.object(em, '_cache_conn', None), \
+         patch.object(em, 'EMBEDDING_CACHE_PATH', str(tmp_path / "cache.sqlite3")):
+        em._cached_encode.cache_clear()
+        first = em._cached_encode("fintech startups")
+        second = em._cached_encode("fintech startups")
+        em._cached_encode.cache_clear()
+        # A fresh process-level cache still hits the on-disk copy
+        third = em._cached_encode("fintech startups")
+        em._cache_conn.close()
+    em._cached_encode.cache_clear()
+
+    model.encode.assert_called_once()
+    assert first.tolist() == second.tolist() == third.tolist() == [0.5, 0.25, 0.125]
+
+def test_embedding_cache_key_separates_onnx_and_torch_encoders():
+    from pinecone_pipeline import embedding_manager as em
+
+    onnx_model = MagicMock(backend="onnx")
+    torch_model = MagicMock(backend="torch")
+
+    assert em._encoder_backend(onnx_model) == f"onnx:{em.ONNX_MODEL_FILE}"
+    assert em._encoder_backend(torch_model) == "torch"
+    assert em._cache_key("fintech", em._encoder_backend(onnx_model)) != em._cache_key("fintech", "torch")
+
+def test_hydrate_startup_text_uses_single_snowflake_lookup():
+    from pinecone_pipeline.embedding_manager import EmbeddingManager
+
+    manager = EmbeddingManager.__new__(EmbeddingManager)
+    manager.snowflake_manager = MagicMock()
+    manager.snowflake_manager.get_startup_summaries.return_value = {"Acme": "Full Acme summary"}
+    results = [
+        {"source": "startup", "text": None, "snowflake_id": "Acme", "text_preview": "Acme..."},
+        {"source": "startup", "text": None, "snowflake_id": "Beta", "text_preview": "Beta..."},
+        {"source": "deloitte-report", "text": "Report text"},
+    ]
+
+    assert manager._hydrate_startup_text(results)
+
+    manager.snowflake_manager.get_startup_summaries.assert_called_once_with(["Acme", "Beta"])
+    assert [r["text"] for r in results] == ["Full Acme summary", "Beta...", "Report text"]
+
+def test_search_with_embedding_drops_matches_below_min_score():
+    from pinecone_pipeline import embedding_manager as em
+
+    manager = em.EmbeddingManager.__new__(em.EmbeddingManager)
+    manager.PINECONE_API_KEY = "key"
+    manager.reports_index_name = "deloitte-reports"
+    manager.snowflake_manager = None
+    manager.index = MagicMock()
+    manager.index.query.return_value = {"matches": [
+        {"id": "a", "score": 0.9, "metadata": {"startup_name": "A", "text": "A text"}},
+        {"id": "b", "score": 0.1, "metadata": {"startup_name": "B", "text": "B text"}}
+    ]}
+    reports_index = MagicMock()
+    reports_index.query.return_value = {"matches": [
+        {"id": "r", "score": 0.15, "metadata": {"title": "Report", "text": "Report text"}}
+    ]}
+    with patch.object(em, '_get_index', return_value=reports_index):
+        results, complete = manager._search_with_embedding("payments", [0.1], None, 5, min_score=0.2)
+
+    assert [r["id"] for r in results] == ["a"]
+    assert complete
+
+def test_search_similar_startups_does_not_cache_failed_searches():
+    from pinecone_pipeline import embedding_manager as em
+
+    manager = em.EmbeddingManager.__new__(em.EmbeddingManager)
+    manager.PINECONE_API_KEY = "key"
+    manager.reports_index_name = "deloitte-reports"
+    manager.snowflake_manager = None
+    manager._search_cache = em.OrderedDict()
+    manager._search_cache_lock = threading.Lock()
+    manager.index = MagicMock()
+    manager.index.query.side_effect = [
+        Exception("Pinecone unavailable"),
+        {"matches": [{"id": "a", "score": 0.9, "metadata": {"startup_name": "A", "text": "A text"}}]},
+    ]
+    reports_index = MagicMock()
+    reports_index.query.return_value = {"matches": []}
+    with patch.object(em, '_get_index', return_value=reports_index), \
+         patch.object(em, '_cached_encode', return_value=em.np.zeros(3, dtype=em.np.float32)):
+        first = manager.search_similar_startups("fintech", top_k=5)
+        second = manager.search_similar_startups("fintech", top_k=5)
+        third = manager.search_similar_startups("fintech", top_k=5)
+
+    assert first == []
+    assert [r["id"] for r in second] == [r["id"] for r in third] == ["a"]
+    assert manager.index.query.call_count == 2
+
+def test_store_summary_embeddings_bulk_waits_on_async_upserts():
+    from pinecone_pipeline.embedding_manager import EmbeddingManager
+
+    manager = EmbeddingManager.__new__(EmbeddingManager)
+    manager.index = MagicMock()
+    manager._search_cache = {("stale", None, 5, None): (float("inf"), [])}
+    manager._search_cache_lock = threading.Lock()
+    manager.snowflake_manager = None
+    vectors = [{"id": "a", "summary": "A"}, None, {"id": "c", "summary": "C"}]
+    with patch.object(EmbeddingManager, '_prepare_summary_vector', side_effect=vectors), \
+         patch.object(EmbeddingManager, '_apply_snowflake_result'), \
+         patch.object(EmbeddingManager, 'encode_many', return_value=[[0.1], [0.2]]) as mock_encode:
+        statuses = manager.store_summary_embeddings_bulk([{}, {}, {}])
+
+    mock_encode.assert_called_once_with(["A", "C"])
+    manager.index.upsert.assert_called_once_with(
+        vectors=[{"id": "a", "values": [0.1]}, {"id": "c", "values": [0.2]}], async_req=True
+    )
+    manager.index.upsert.return_value.result.assert_called_once()
+    assert statuses == [True, False, True]
+    assert manager._search_cache == {}
+
+def test_search_similar_startups_reuses_recent_results():
+    from pinecone_pipeline import embedding_manager as em
+
+    manager = em.EmbeddingManager.__new__(em.EmbeddingManager)
+    manager._search_cache = em.OrderedDict()
+    manager._search_cache_lock = threading.Lock()
+    with patch.object(em, '_cached_encode', return_value=em.np.zeros(3, dtype=em.np.float32)), \
+         patch.object(em.EmbeddingManager, '_search_with_embedding', return_value=([{"id": "a"}], True)) as mock_search:
+        first = manager.search_similar_startups("fintech", top_k=5)
+        second = manager.search_similar_startups("fintech", top_k=5)
+        bulk = manager.search_similar_startups_bulk(["fintech"], top_k=5)
+
+    mock_search.assert_called_once()
+    assert first == second == bulk[0] == [{"id": "a"}]
+
+def test_store_summary_embeddings_bulk_returns_stored_metadata():
+    from pinecone_pipeline.embedding_manager import EmbeddingManager
+
+    manager = EmbeddingManager.__new__(EmbeddingManager)
+    manager.index = MagicMock()
+    manager._search_cache = {("stale", None, 5, None): (float("inf"), [])}
+    manager._search_cache_lock = threading.Lock()
+    manager.snowflake_manager = None
+    vectors = [{"id": "a", "summary": "A", "metadata": {"snowflake_status": "success"}}, None]
+    with patch.object(EmbeddingManager, '_prepare_summary_vector', side_effect=vectors), \
+         patch.object(EmbeddingManager, '_apply_snowflake_result'), \
+         patch.object(EmbeddingManager, 'encode_many', return_value=[[0.1]]):
+        stored = manager.store_summary_embeddings_bulk([{}, {}], return_metadata=True)
+
+    assert stored == [{"snowflake_status": "success"}, None]
+
+def test_prepare_summary_vector_collects_background_snowflake_write():
+    from pinecone_pipeline.embedding_manager import EmbeddingManager
+
+    manager = EmbeddingManager.__new__(EmbeddingManager)
+    manager.snowflake_manager = MagicMock()
+    manager.snowflake_manager.store_startup_summary.return_value = "Acme"
+    with patch.object(EmbeddingManager, 'check_startup_exists', return_value=False):
+        vector = manager._prepare_summary_vector(
+            summary="Acme builds payment rails.", startup_name="Acme", industry="Fintech",
+            website_url="", linkedin_urls=[], original_filename="acme.pdf", s3_location="s3://b/acme.pdf"
+        )
+
+    manager._apply_snowflake_result(vector, vector.pop("summary"))
+
+    assert "snowflake_future" not in vector
+    assert vector["metadata"]["snowflake_status"] == "success"
+    assert vector["metadata"]["snowflake_id"] == "Acme"
+    assert "text_gz_b64" not in vector["metadata"]
+
+def test_apply_snowflake_result_keeps_full_text_when_no_row_was_updated():
+    from pinecone_pipeline.embedding_manager import EmbeddingManager, _metadata_text
+
+    manager = EmbeddingManager.__new__(EmbeddingManager)
+    future = MagicMock()
+    future.result.return_value = None
+    vector = {"metadata": {"startup_name": "Acme", "snowflake_status": "skipped"}, "snowflake_future": future}
+
+    manager._apply_snowflake_result(vector, "Acme builds payment rails.")
+
+    assert vector["metadata"]["snowflake_status"] == "skipped"
+    assert "snowflake_id" not in vector["metadata"]
+    assert _metadata_text(vector["metadata"]) == "Acme builds payment rails."
+
+def test_store_summary_embeddings_bulk_writes_snowflake_in_one_batch():
+    from pinecone_pipeline.embedding_manager import EmbeddingManager
+
+    manager = EmbeddingManager.__new__(EmbeddingManager)
+    manager.index = MagicMock()
+    manager._search_cache = {}
+    manager._search_cache_lock = threading.Lock()
+    manager.snowflake_manager = MagicMock()
+    manager.snowflake_manager.store_startup_summaries.return_value = ["Acme"]
+    items = [
+        {"summary": f"{name} summary", "startup_name": name, "industry": "AI", "website_url": "",
+         "linkedin_urls": [], "original_filename": f"{name}.pdf", "s3_location": f"s3://b/{name}.pdf"}
+        for name in ("Acme", "Beta")
+    ]
+    with patch.object(EmbeddingManager, 'check_startup_exists', return_value=False), \
+         patch.object(EmbeddingManager, 'encode_many', return_value=[[0.1], [0.2]]):
+        stored = manager.store_summary_embeddings_bulk(items, return_metadata=True)
+
+    manager.snowflake_manager.store_startup_summaries.assert_called_once_with(items)
+    manager.snowflake_manager.store_startup_summary.assert_not_called()
+    assert stored[0]["snowflake_id"] == "Acme" and "text_gz_b64" not in stored[0]
+    # Beta has no STARTUP row, so its full summary stays in Pinecone
+    assert "snowflake_id" not in stored[1] and "text_gz_b64" in stored[1]
+
+def test_metadata_text_round_trips_compressed_summary():
+    from pinecone_pipeline.embedding_manager import _compress_text, _metadata_text
+
+    summary = "Acme builds payment rails for SMBs. " * 50
+    compressed = _compress_text(summary)
+
+    assert len(compressed) < len(summary)
+    assert _metadata_text({"text_gz_b64": compressed}) == summary
+    assert _metadata_text({"text": "plain"}) == "plain"
+
+def test_snowflake_manager_reuses_pooled_connection():
+    from pinecone_pipeline.snowflake_manager import SnowflakeManager
+
+    manager = SnowflakeManager()
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value.fetchall.return_value = [("Acme", "Acme summary")]
+
+    with patch.object(manager, "get_connection", return_value=conn) as mock_connect:
+        manager.store_startup_summary("Acme", "Acme summary")
+        summaries = manager.get_startup_summaries(["Acme"])
+
+    mock_connect.assert_called_once()
+    conn.close.assert_not_called()
+    assert summaries == {"Acme": "Acme summary"}
+
+# --- Gemini Assistant Tests ---
+def test_process_query_with_results_caches_identical_requests():
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant
+
+    assistant = GeminiAssistant()
+    assistant.model = MagicMock()
+    assistant.model.generate_content.return_value.text = "Acme is a fintech startup."
+    results = [{"id": "acme_1", "source": "startup", "startup_name": "Acme", "text": "Payments"}]
+
+    first = assistant.process_query_with_results("Tell me about Acme", results)
+    second = assistant.process_query_with_results("Tell me about Acme", list(reversed(results)))
+    assistant.process_query_with_results("Tell me about Acme", [{**results[0], "id": "acme_2"}])
+
+    assert first == second == "Acme is a fintech startup."
+    assert assistant.model.generate_content.call_count == 2
+
+def test_response_cache_expires_entries_and_ignores_query_case():
+    from pinecone_pipeline import gemini_assistant as ga
+
+    assistant = ga.GeminiAssistant()
+    assistant.model = MagicMock()
+    assistant.model.generate_content.return_value.text = "Acme is a fintech startup."
+    results = [{"id": "acme_1", "score": 0.9, "text": "Payments"}]
+
+    assistant.process_query_with_results("Tell me about Acme", results)
+    assistant.process_query_with_results("  tell me about ACME ", results)
+    assert assistant.model.generate_content.call_count == 1
+
+    with patch.object(ga.time, "monotonic", return_value=ga.time.monotonic() + ga.RESPONSE_CACHE_TTL + 1):
+        assistant.process_query_with_results("Tell me about Acme", results)
+    assert assistant.model.generate_content.call_count == 2
+
+def test_process_query_with_results_skips_gemini_without_context():
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant, NO_CONTEXT_RESPONSE
+
+    assistant = GeminiAssistant()
+    assistant.model = MagicMock()
+
+    response = assistant.process_query_with_results("Any fintech?", [{"id": "x", "source": "startup", "text": ""}])
+
+    assert response == NO_CONTEXT_RESPONSE
+    assistant.model.generate_content.assert_not_called()
+
+def test_process_queries_batch_maps_batch_results_back_to_pairs():
+    from pinecone_pipeline import gemini_assistant as ga
+
+    assistant = ga.GeminiAssistant()
+    client = MagicMock()
+    client.batches.get.return_value.state.name = "JOB_STATE_SUCCEEDED"
+    pairs = [
+        ("About Acme?", [{"id": "a", "text": "Acme payments"}]),
+        ("Anything?", []),
+        ("About Beta?", [{"id": "b", "text": "Beta logistics"}]),
+    ]
+    keys = {query: f"q_{i}_{assistant._response_cache_key(query, results).hex()}" for i, (query, results) in enumerate(pairs)}
+    client.files.download.return_value = b"\n".join([
+        json.dumps({"key": keys["About Beta?"], "response": {"candidates": [{"content": {"parts": [{"text": "Beta"}]}}]}}).encode(),
+        json.dumps({"key": keys["About Acme?"], "response": {"candidates": [{"content": {"parts": [{"text": "Acme"}]}}]}}).encode(),
+    ])
+
+    with patch.object(ga, "genai_sdk") as mock_sdk:
+        mock_sdk.Client.return_value = client
+        responses = assistant.process_queries_batch(pairs)
+
+    assert responses == ["Acme", ga.NO_CONTEXT_RESPONSE, "Beta"]
+    client.batches.create.assert_called_once()
+    # Batch answers are cached like interactive ones
+    assert assistant.process_query_with_results(*pairs[0]) == "Acme"
+
+def test_process_queries_batch_cancels_job_after_max_wait():
+    from pinecone_pipeline import gemini_assistant as ga
+
+    assistant = ga.GeminiAssistant()
+    client = MagicMock()
+    client.batches.get.return_value.state.name = "JOB_STATE_RUNNING"
+    pairs = [("About Acme?", [{"id": "a", "text": "Acme payments"}])]
+
+    with patch.object(ga, "genai_sdk") as mock_sdk:
+        mock_sdk.Client.return_value = client
+        responses = assistant.process_queries_batch(pairs, max_wait=0)
+
+    assert responses == [ga.ERROR_RESPONSE]
+    client.batches.cancel.assert_called_once_with(name=client.batches.create.return_value.name)
+
+@patch('main.embedding_manager.search_similar_startups_bulk')
+@patch('main.gemini_assistant.submit_queries_batch')
+def test_bulk_analyze_returns_job_name_without_waiting(mock_submit, mock_search, client):
+    mock_search.return_value = [[{"id": "a", "text": "Acme"}], []]
+    mock_submit.return_value = ([None, "No relevant results were indexed for this query."], "batches/123")
+
+    response = client.post("/bulk-analyze", json={"queries": ["About Acme?", "Anything?"]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["job_name"] == "batches/123"
+    assert [r["response"] for r in data["results"]] == [None, "No relevant results were indexed for this query."]
+
+@patch('main.gemini_assistant.get_batch_results')
+def test_bulk_analyze_results_reports_state_and_answers(mock_results, client):
+    mock_results.return_value = ("JOB_STATE_SUCCEEDED", {0: "Acme"})
+
+    response = client.get("/bulk-analyze/results", params={"job_name": "batches/123"})
+
+    assert response.status_code == 200
+    assert response.json() == {"job_name": "batches/123", "state": "JOB_STATE_SUCCEEDED", "done": True, "responses": {"0": "Acme"}}
+    mock_results.assert_called_once_with("batches/123")
+
+@patch('pinecone_pipeline.gemini_assistant.genai_sdk', None)
+def test_bulk_analyze_results_without_genai_sdk_returns_501(client):
+    response = client.get("/bulk-analyze/results", params={"job_name": "batches/123"})
+
+    assert response.status_code == 501
+    assert "google-genai is not installed" in response.json()["detail"]
+
+def test_clean_response_format_normalizes_bullets():
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant
+
+    assistant = GeminiAssistant()
+    raw = "Based on the provided search results:\n  * Acme (Result #1) sells APIs• Beta ships trucks  \n\n\n\n- Gamma"
+
+    assert assistant._clean_response_format(raw) == "• Acme  sells APIs\n• Beta ships trucks\n\n• Gamma"
+
+def test_process_query_with_results_stream_cleans_complete_lines():
+    import asyncio
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant
+
+    async def fake_stream():
+        for text in ["From the search results:\n* Acme (Res", "ult #1) sells APIs\n- Be", "ta ships trucks"]:
+            yield MagicMock(text=text)
+
+    async def collect():
+        return [chunk async for chunk in assistant.process_query_with_results_stream("Who?", results)]
+
+    assistant = GeminiAssistant()
+    assistant.model = MagicMock()
+    assistant.model.generate_content_async = AsyncMock(return_value=fake_stream())
+    results = [{"id": "acme_1", "text": "Payments"}]
+
+    chunks = asyncio.run(collect())
+
+    assert "".join(chunks) == "• Acme  sells APIs\n• Beta ships trucks"
+    # /chat for the same query and results gets the cleaned text, not the raw stream
+    assert assistant.process_query_with_results("Who?", results) == "• Acme  sells APIs\n• Beta ships trucks"
+    assistant.model.generate_content.assert_not_called()
+
+def test_process_query_with_results_uses_pinned_context_for_hot_results():
+    from pinecone_pipeline import gemini_assistant as ga
+
+    assistant = ga.GeminiAssistant()
+    assistant.model = MagicMock()
+    assistant.model.generate_content.return_value.text = "inline"
+    pinned_model = MagicMock()
+    pinned_model.generate_content.return_value.text = "pinned"
+    results = [{"id": "acme_1", "startup_name": "Acme", "text": "Payments"}]
+
+    with patch.object(ga, "CONTEXT_CACHE_REFRESH_QUERIES", 1), \
+         patch.object(ga.caching.CachedContent, "create") as mock_create, \
+         patch.object(ga.genai.GenerativeModel, "from_cached_content", return_value=pinned_model):
+        first = assistant.process_query_with_results("Who is Acme?", results)
+        # The context is pinned in the background; wait for the refresh to finish
+        ga._PIN_EXECUTOR.submit(lambda: None).result()
+        second = assistant.process_query_with_results("What does Acme sell?", results)
+
+    assert (first, second) == ("inline", "pinned")
+    assert "Payments" in mock_create.call_args.kwargs["contents"][0]
+    assert "Payments" not in pinned_model.generate_content.call_args.args[0]
+
+def test_process_query_with_results_falls_back_to_inline_context_when_pin_expired_or_fails():
+    from pinecone_pipeline import gemini_assistant as ga
+
+    assistant = ga.GeminiAssistant()
+    assistant.model = MagicMock()
+    assistant.model.generate_content.return_value.text = "inline"
+    pinned_model = MagicMock()
+    pinned_model.generate_content.side_effect = Exception("CachedContent not found")
+    assistant._pinned_model = pinned_model
+    assistant._pinned_ids = frozenset({"acme_1"})
+    assistant._pinned_expires_at = ga.time.monotonic() - 1
+    results = [{"id": "acme_1", "startup_name": "Acme", "text": "Payments"}]
+
+    with patch.object(ga.caching.CachedContent, "create", side_effect=Exception("too small")):
+        expired = assistant.process_query_with_results("Who is Acme?", results)
+        # The expired pin triggers a background rebuild (failing here); let it finish
+        ga._PIN_EXECUTOR.submit(lambda: None).result()
+        assistant._pinned_expires_at = ga.time.monotonic() + 60
+        failed = assistant.process_query_with_results("What does Acme sell?", results)
+
+    assert (expired, failed) == ("inline", "inline")
+    pinned_model.generate_content.assert_called_once()
+    assert assistant._pinned_model is None
+
+def test_process_query_with_results_renders_structured_bullets():
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant, ANSWER_GENERATION_CONFIG
+
+    assistant = GeminiAssistant()
+    assistant.model = MagicMock()
+    assistant.model.generate_content.return_value.text = '{"bullets": ["Acme sells APIs", " Founded 2020 "]}'
+
+    response = assistant.process_query_with_results("Acme?", [{"id": "acme_1", "text": "Payments"}])
+
+    assert response == "• Acme sells APIs\n• Founded 2020"
+    assert assistant.model.generate_content.call_args.kwargs["generation_config"] == ANSWER_GENERATION_CONFIG
+
+def test_render_answer_keeps_complete_bullets_of_truncated_json():
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant
+
+    assistant = GeminiAssistant()
+    truncated = '{"bullets": ["Acme sells \\"payments\\" APIs", "Founded 2020", "Raised a Series B led by Seq'
+
+    assert assistant._render_answer(truncated) == '• Acme sells "payments" APIs\n• Founded 2020'
+    assert assistant._render_answer("Plain answer") == "Plain answer"
+
+def test_process_query_with_results_skips_gemini_below_relevance_threshold():
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant, NO_CONTEXT_RESPONSE
+
+    assistant = GeminiAssistant()
+    assistant.model = MagicMock()
+    weak_results = [{"id": "x", "score": 0.05, "text": "Unrelated"}, {"id": "y", "score": 0.1, "text": "Also unrelated"}]
+
+    response = assistant.process_query_with_results("Any fintech?", weak_results)
+
+    assert response == NO_CONTEXT_RESPONSE
+    assistant.model.generate_content.assert_not_called()
+
+def test_process_queries_answers_pairs_concurrently_in_order():
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant, NO_CONTEXT_RESPONSE
+
+    assistant = GeminiAssistant()
+    assistant.model = MagicMock()
+    assistant.model.generate_content_async = AsyncMock(side_effect=[
+        MagicMock(text=json.dumps({"bullets": ["First answer"]})),
+        MagicMock(text=json.dumps({"bullets": ["Second answer"]}))
+    ])
+    pairs = [
+        ("Fintech?", [{"id": "a", "score": 0.9, "text": "Fintech startup"}]),
+        ("Nothing?", []),
+        ("Health?", [{"id": "b", "score": 0.8, "text": "Health startup"}])
+    ]
+
+    responses = asyncio.run(assistant.process_queries(pairs))
+
+    assert responses == ["• First answer", NO_CONTEXT_RESPONSE, "• Second answer"]
+    assert assistant.model.generate_content_async.await_count == 2
+
+def test_build_prompt_wraps_results_in_compact_doc_tags():
+    from pinecone_pipeline.gemini_assistant import GeminiAssistant
+
+    assistant = GeminiAssistant()
+    prompt = assistant._build_prompt("Fintech trends?", [
+        {"source": "startup", "startup_name": "Acme", "industry": "Fintech", "text": "Payment rails"},
+        {"source": "deloitte-report", "report_title": "Outlook", "industry": "Fintech", "year": "2024", "text": "Growth"}
+    ])
+
+    assert prompt == (
+        'QUERY: Fintech trends?\nSEARCH RESULTS:\n'
+        '<doc id="1" type="startup" name="Acme" industry="Fintech">Payment rails</doc>'
+        '<doc id="2" type="industry report" title="Outlook" industry="Fintech" year="2024">Growth</doc>'
+    )
+
+def test_summarize_pitch_deck_with_gemini_async_generates_from_memory():
+    from pinecone_pipeline import summary
+
+    uploaded = MagicMock()
+    uploaded.state.name = "ACTIVE"
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(return_value=MagicMock(text="Investor summary"))
+    with patch.object(summary, 'genai') as mock_genai, \
+         patch.object(summary, 'get_generative_model', return_value=model), \
+         patch.object(summary, 'configure_gemini'):
+        mock_genai.upload_file.return_value = uploaded
+        mock_genai.get_file.return_value.state.name = "ACTIVE"
+        result = asyncio.run(summary.summarize_pitch_deck_with_gemini_async(
+            file_path=None, api_key="key", model_name="gemini-2.0-flash", pdf_bytes=b"%PDF", display_name="deck.pdf"
+        ))
+
+    assert result == "Investor summary"
+    model.generate_content_async.assert_awaited_once_with([summary.PITCH_DECK_PROMPT, uploaded])
+    mock_genai.delete_file.assert_called_once_with(uploaded.name)
+
+# --- MCP Google Search Tests ---
+def test_mcp_search_client_connects_once_for_concurrent_searches():
+    from pinecone_pipeline import mcp_google_search_agent as mcp_agent
+
+    client = mcp_agent.MCPGoogleSearchClient()
+    with patch.object(mcp_agent, "MCPServerStdio") as mock_server_cls, patch.object(mcp_agent, "Agent") as mock_agent_cls:
+        mock_server_cls.return_value.connect = AsyncMock()
+        mock_server_cls.return_value.cleanup = AsyncMock()
+
+        async def run():
+            agents = await asyncio.gather(client.connect(), client.connect(), client.connect())
+            await client.close()
+            return agents
+
+        agents = asyncio.run(run())
+
+    mock_server_cls.assert_called_once()
+    mock_server_cls.return_value.connect.assert_awaited_once()
+    mock_server_cls.return_value.cleanup.assert_awaited_once()
+    assert all(agent is mock_agent_cls.return_value for agent in agents)
+
+def test_mcp_search_reconnects_after_a_failed_search():
+    from pinecone_pipeline import mcp_google_search_agent as mcp_agent
+
+    mcp_agent._search_cache.clear()
+    client = mcp_agent.MCPGoogleSearchClient()
+    run_result = MagicMock(final_output='[{"title": "Acme raises", "url": "https://example.com"}]')
+    with patch.object(mcp_agent, "search_client", client), \
+         patch.object(mcp_agent, "MCPServerStdio") as mock_server_cls, patch.object(mcp_agent, "Agent"), \
+         patch.object(mcp_agent.Runner, "run", AsyncMock(side_effect=[BrokenPipeError("npx exited"), run_result])):
+        mock_server_cls.return_value.connect = AsyncMock()
+        mock_server_cls.return_value.cleanup = AsyncMock()
+
+        async def run():
+            with pytest.raises(BrokenPipeError):
+                await mcp_agent.mcp_search("Acme news")
+            return await mcp_agent.mcp_search("Acme news")
+
+        items = asyncio.run(run())
+
+    assert items == [{"title": "Acme raises", "url": "https://example.com"}]
+    assert mock_server_cls.call_count == 2
+    mock_server_cls.return_value.cleanup.assert_awaited_once()
+    mcp_agent._search_cache.clear()
+
+def test_google_search_with_fallback_runs_both_searches_and_picks_industry_on_miss():
+    from pinecone_pipeline import mcp_google_search_agent as mcp_agent
+
+    async def fake_search(query, num_results=5):
+        if "industry" in query:
+            return [{"title": "AI funding rises", "url": "https://example.com/ai"}]
+        return [{"title": "Unrelated story", "snippet": "nothing here"}]
+
+    with patch.object(mcp_agent, "SPECULATIVE_FALLBACK", True), \
+         patch.object(mcp_agent, "mcp_search", AsyncMock(side_effect=fake_search)) as mock_search:
+        results, search_type = asyncio.run(mcp_agent.google_search_with_fallback("Acme", "AI"))
+
+    assert mock_search.await_count == 2
+    assert search_type == "industry"
+    assert results["results"][0]["url"] == "https://example.com/ai"
+
+def test_google_search_with_fallback_returns_startup_hit_without_waiting_for_industry():
+    from pinecone_pipeline import mcp_google_search_agent as mcp_agent
+
+    industry_cancelled = []
+
+    async def fake_search(query, num_results=5):
+        if "industry" in query:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                industry_cancelled.append(True)
+                raise
+        return [{"title": "Acme raises Series B", "url": "https://example.com/acme"}]
+
+    with patch.object(mcp_agent, "SPECULATIVE_FALLBACK", True), \
+         patch.object(mcp_agent, "mcp_search", AsyncMock(side_effect=fake_search)):
+        results, search_type = asyncio.run(mcp_agent.google_search_with_fallback("Acme", "AI"))
+
+    assert search_type == "startup"
+    assert results["results"][0]["url"] == "https://example.com/acme"
+    assert industry_cancelled == [True]
+
+def test_google_search_with_fallback_treats_timed_out_search_as_miss():
+    from pinecone_pipeline import mcp_google_search_agent as mcp_agent
+
+    async def fake_search(query, num_results=5):
+        if "industry" in query:
+            return [{"title": "AI funding rises", "url": "https://example.com/ai"}]
+        await asyncio.sleep(10)
+
+    with patch.object(mcp_agent, "SPECULATIVE_FALLBACK", True), \
+         patch.object(mcp_agent, "SEARCH_TIMEOUT", 0.05), \
+         patch.object(mcp_agent, "mcp_search", AsyncMock(side_effect=fake_search)):
+        results, search_type = asyncio.run(mcp_agent.google_search_with_fallback("Acme", "AI"))
+
+    assert search_type == "industry"
+    assert results["results"][0]["url"] == "https://example.com/ai"
+
+def test_parse_results_accepts_fenced_json():
+    from pinecone_pipeline.mcp_google_search_agent import _parse_results
+
+    output = '```json\n[{"title": "Acme raises", "url": "https://example.com"}]\n```'
+
+    assert _parse_results(output) == [{"title": "Acme raises", "url": "https://example.com"}]
+    assert _parse_results("not json") == []
+
+def test_mcp_search_reuses_cached_results_for_repeated_queries():
+    from pinecone_pipeline import mcp_google_search_agent as mcp_agent
+
+    mcp_agent._search_cache.clear()
+    run_result = MagicMock(final_output='[{"title": "Acme raises", "url": "https://example.com"}]')
+    with patch.object(mcp_agent.search_client, "connect", AsyncMock()), \
+         patch.object(mcp_agent.Runner, "run", AsyncMock(return_value=run_result)) as mock_run:
+        first = asyncio.run(mcp_agent.mcp_search("Acme news"))
+        second = asyncio.run(mcp_agent.mcp_search("  acme NEWS "))
+
+    mock_run.assert_awaited_once()
+    assert first == second == [{"title": "Acme raises", "url": "https://example.com"}]
+    mcp_agent._search_cache.clear()
@@ -1,29 +1,44 @@
 import os
+import functools
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
-from pinecone import Pinecone, ServerlessSpec
+from pinecone import ServerlessSpec
+
+# Prefer the gRPC transport (HTTP/2 + protobuf); fall back to REST without pinecone[grpc]
+try:
+    from pinecone.grpc import PineconeGRPC as Pinecone
+except ImportError:
+    from pinecone import Pinecone
 
 # Load environment variables
 load_dotenv()
 
-# Global model cache for efficiency
-_model = None
+# Concurrent upsert requests per Pinecone index connection
+UPSERT_POOL_THREADS = 30
+
+# Indexes confirmed to exist in this process, so later stores skip list_indexes()
+_known_indexes = set()
 
+@functools.lru_cache(maxsize=None)
+def get_pinecone_client(api_key):
+    """Create the Pinecone client once per API key and reuse its connections"""
+    return Pinecone(api_key=api_key)
+
+@functools.lru_cache(maxsize=None)
 def get_embedding_model(model_name="sentence-transformers/all-MiniLM-L6-v2"):
-    """Get or initialize the embedding model"""
-    global _model
-    if _model is None:
+    """Load the embedding model once per model name and reuse it"""
+    try:
+        model = SentenceTransformer(model_name)
+        print(f"Embedding model initialized: {model_name}")
+        return model
+    except Exception as e:
+        print(f"Error initializing embedding model: {str(e)}")
         try:
-            _model = SentenceTransformer(model_name)
-            print(f"Embedding model initialized: {model_name}")
-        except Exception as e:
-            print(f"Error initializing embedding model: {str(e)}")
-            try:
-                _model = SentenceTransformer("all-MiniLM-L6-v2")
-                print("Using fallback model: all-MiniLM-L6-v2")
-            except Exception as e2:
-                raise Exception(f"Failed to initialize embedding model: {str(e2)}")
-    return _model
+            model = SentenceTransformer("all-MiniLM-L6-v2")
+            print("Using fallback model: all-MiniLM-L6-v2")
+            return model
+        except Exception as e2:
+            raise Exception(f"Failed to initialize embedding model: {str(e2)}")
 
 def generate_embeddings(text, model_name="sentence-transformers/all-MiniLM-L6-v2"):
     """Generate embeddings for text using the specified model"""
@@ -32,7 +47,8 @@ def generate_embeddings(text, model_name="sentence-transformers/all-MiniLM-L6-v2
     if isinstance(text, str):
         return model.encode(text).tolist()
     else:
-        return model.encode(text).tolist()
+        # One batched call tokenizes all texts together with the fast tokenizer
+        return model.encode(list(text), batch_size=64, show_progress_bar=False).tolist()
 
 def store_in_pinecone(embeddings_data, index_name="deloitte-reports"):
     """Store embeddings data in Pinecone"""
@@ -43,10 +59,10 @@ def store_in_pinecone(embeddings_data, index_name="deloitte-reports"):
         if not api_key:
             raise ValueError("Pinecone API key not configured")
             
-        pc = Pinecone(api_key=api_key)
+        pc = get_pinecone_client(api_key)
         
-        # Check if index exists
-        if index_name not in [idx["name"] for idx in pc.list_indexes()]:
+        # Check if index exists (once per process)
+        if index_name not in _known_indexes and index_name not in [idx["name"] for idx in pc.list_indexes()]:
             # Get dimension from first embedding
             dimension = len(embeddings_data[0]['embedding'])
             
@@ -61,8 +77,10 @@ def store_in_pinecone(embeddings_data, index_name="deloitte-reports"):
                 )
             )
         
-        # Get index
-        index = pc.Index(index_name)
+        _known_indexes.add(index_name)
+        
+        # Get index (thread pool lets batch upserts run in parallel)
+        index = pc.Index(index_name, pool_threads=UPSERT_POOL_THREADS)
         
         # Prepare vectors for Pinecone
         vectors = []
@@ -81,11 +99,18 @@ def store_in_pinecone(embeddings_data, index_name="deloitte-reports"):
             }
             vectors.append(vector)
         
-        # Upsert in batches
+        # Upsert in batches, issuing all of them before waiting on any
         batch_size = 100
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i:i + batch_size]
-            index.upsert(vectors=batch)
+        async_results = [
+            index.upsert(vectors=vectors[i:i + batch_size], async_req=True)
+            for i in range(0, len(vectors), batch_size)
+        ]
+        for async_result in async_results:
+            # gRPC returns a future, REST an AsyncResult
+            if hasattr(async_result, "result"):
+                async_result.result()
+            else:
+                async_result.get()
         
         print(f"Stored {len(embeddings_data)} chunks in Pinecone index '{index_name}'")
         return True
@@ -102,7 +127,7 @@ def search_pinecone(query, index_name="nvidia-financials", filter_dict=None, top
         if not api_key:
             raise ValueError("Pinecone API key not configured")
             
-        pc = Pinecone(api_key=api_key)
+        pc = get_pinecone_client(api_key)
         
         # Generate embedding for query
         query_embedding = generate_embeddings(query)
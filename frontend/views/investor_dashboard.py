@@ -20,6 +20,10 @@ STATUS_OPTIONS = {
     "Rejected": "Rejected"
 }
 
+# Stored status values in display order, and each value's position for one-step lookups
+STATUS_VALUES = list(STATUS_OPTIONS.values())
+STATUS_INDEX = {status: i for i, status in enumerate(STATUS_VALUES)}
+
 # Dynamically add project root (InvestorIntel.Ai/) to sys.path
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 if PROJECT_ROOT not in sys.path:
@@ -719,8 +723,8 @@ def display_startup_details(startup_id, main_col):
             # Status selection dropdown
             new_status = st.selectbox(
                 "Select New Status:",
-                options=["Not Viewed", "Decision Pending", "Funded", "Rejected"],
-                index=["Not Viewed", "Decision Pending", "Funded", "Rejected"].index(current_status) if current_status in ["Not Viewed", "Decision Pending", "Funded", "Rejected"] else 0
+                options=STATUS_VALUES,
+                index=STATUS_INDEX.get(current_status, 0)
             )
             
             # Get the investor ID from session state